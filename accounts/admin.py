@@ -1,9 +1,17 @@
 from django import forms
 from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.template.response import TemplateResponse
 from django.utils import timezone
 
-from accounts.models import Account
+from accounts.cache import cached_reviewers
+from accounts.exports import streaming_export_response
+from accounts.forms import check_phone_available
+from accounts.models import Account, AccountStatusEvent
+from accounts.paginators import EstimatedCountPaginator
 
 
 class AccountAdminForm(forms.ModelForm):
@@ -18,10 +26,137 @@ class AccountAdminForm(forms.ModelForm):
 
         return cleaned_data
 
+    def clean_phone_number(self):
+        return check_phone_available(
+            self.cleaned_data["phone_number"], account=self.instance
+        )
+
+
+BULK_REVIEW_MESSAGES = {
+    "approved": "approved",
+    "rejected": "rejected",
+    "additional_docs_required": "asked for additional documents",
+}
+
+
+class ReviewReasonForm(forms.Form):
+    reason = forms.CharField(widget=forms.Textarea(attrs={"rows": 4, "cols": 60}))
+
+
+class AccountStatusEventInline(admin.TabularInline):
+    model = AccountStatusEvent
+    fields = [
+        "created_at",
+        "previous_status",
+        "new_status",
+        "reviewer",
+        "change_method",
+        "reason",
+    ]
+    readonly_fields = fields
+    ordering = ["-created_at"]
+    extra = 0
+    can_delete = False
+    verbose_name_plural = "Status history"
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("reviewer")
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+class ReviewerListFilter(admin.SimpleListFilter):
+    """
+    Lists only the users who have reviewed accounts, found with a DISTINCT
+    over account_reviewer_created_idx and cached until a new reviewer appears.
+    With more than ``max_choices`` reviewers it shows a username lookup,
+    autocompleted by the admin's user search, instead.
+    """
+
+    title = "reviewed by"
+    parameter_name = "reviewed_by"
+    username_parameter = "reviewed_by_username"
+    max_choices = 100
+
+    def __init__(self, request, params, model, model_admin):
+        self.username = None
+        if self.username_parameter in params:
+            self.username = params.pop(self.username_parameter)[-1]
+        super().__init__(request, params, model, model_admin)
+        if self.too_many:
+            self.template = "admin/accounts/account/reviewer_filter.html"
+
+    def lookups(self, request, model_admin):
+        reviewers = cached_reviewers(self.reviewer_choices)
+        self.too_many = reviewers is None
+        return reviewers
+
+    def reviewer_choices(self):
+        reviewer_ids = list(
+            Account.objects.filter(reviewed_by__isnull=False)
+            .order_by()
+            .values_list("reviewed_by", flat=True)
+            .distinct()[: self.max_choices + 1]
+        )
+        if len(reviewer_ids) > self.max_choices:
+            return None
+        reviewers = User.objects.filter(pk__in=reviewer_ids).order_by("username")
+        return [
+            (reviewer.pk, reviewer.get_full_name() or reviewer.username)
+            for reviewer in reviewers.only("username", "first_name", "last_name")
+        ]
+
+    def has_output(self):
+        return self.too_many or super().has_output()
+
+    def expected_parameters(self):
+        return [self.parameter_name, self.username_parameter]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(reviewed_by_id=self.value())
+        if self.username:
+            return queryset.filter(reviewed_by__username=self.username)
+        return queryset
+
+    def choices(self, changelist):
+        if not self.too_many:
+            yield from super().choices(changelist)
+            return
+        # A single entry for the lookup form, which keeps the other filters
+        yield {
+            "selected": bool(self.username),
+            "username": self.username or "",
+            "query_string": changelist.get_query_string(
+                remove=[self.parameter_name, self.username_parameter]
+            ),
+            "hidden_params": [
+                (name, value)
+                for name, values in changelist.filter_params.items()
+                if name not in (self.parameter_name, self.username_parameter)
+                for value in values
+            ],
+        }
+
+
+class AccountChangeList(ChangeList):
+    # Long text columns the changelist never displays
+    deferred_fields = ["address", "rejection_reason", "additional_docs_reason"]
+
+    def get_queryset(self, request, *args, **kwargs):
+        return (
+            super().get_queryset(request, *args, **kwargs).defer(*self.deferred_fields)
+        )
+
 
 @admin.register(Account)
 class AccountAdmin(admin.ModelAdmin):
     form = AccountAdminForm
+    inlines = [AccountStatusEventInline]
     list_display = [
         "user",
         "status",
@@ -30,10 +165,14 @@ class AccountAdmin(admin.ModelAdmin):
         "created_at",
         "updated_at",
     ]
-    list_filter = ["status", "reviewed_by", "created_at", "updated_at"]
+    list_filter = ["status", ReviewerListFilter, "created_at", "updated_at"]
     search_fields = ["user__username", "user__email", "phone_number"]
     readonly_fields = ["created_at", "updated_at", "user", "reviewed_by", "reviewed_at"]
+    list_select_related = ["user", "reviewed_by"]
     list_per_page = 25
+    paginator = EstimatedCountPaginator
+    # Skips the unfiltered COUNT(*) shown next to the filtered result count
+    show_full_result_count = False
 
     fieldsets = (
         (
@@ -59,6 +198,14 @@ class AccountAdmin(admin.ModelAdmin):
         ),
     )
 
+    def get_search_results(self, request, queryset, search_term):
+        # Routed to an index by the kind of term instead of ORing ILIKEs over
+        # the search_fields; no joins, so no duplicates
+        return queryset.search(search_term), False
+
+    def get_changelist(self, request, **kwargs):
+        return AccountChangeList
+
     def save_model(self, request, obj, form, change):
         try:
             # Set reviewed_by and reviewed_at for any non-pending status if not already set
@@ -72,7 +219,8 @@ class AccountAdmin(admin.ModelAdmin):
             # Clear approved_at if status changes from approved to something else
             elif obj.status != "approved" and obj.approved_at:
                 obj.approved_at = None
-            super().save_model(request, obj, form, change)
+            # AccountAdminForm has checked the phone number
+            obj.save(validate_unique=False, actor=request.user)
         except ValidationError as e:
             if hasattr(e, "message_dict"):
                 for field, errors in e.message_dict.items():
@@ -82,15 +230,86 @@ class AccountAdmin(admin.ModelAdmin):
                 messages.error(request, str(e))
             raise
 
-    actions = ["approve_accounts"]
+    actions = [
+        "approve_accounts",
+        "reject_accounts",
+        "request_additional_docs",
+        "export_csv",
+        "export_jsonl",
+    ]
+    bulk_review_chunk_size = 1000
 
-    def approve_accounts(self, request, queryset):
-        updated = queryset.update(
-            status="approved",
-            approved_at=timezone.now(),
-            reviewed_by=request.user,
-            reviewed_at=timezone.now(),
+    def _bulk_review(self, request, queryset, status, reason=None):
+        updated = queryset.bulk_review(
+            status,
+            request.user,
+            reason=reason,
+            chunk_size=self.bulk_review_chunk_size,
         )
-        self.message_user(request, f"{updated} account approved successfully.")
+        self.message_user(
+            request,
+            f"{updated} account {BULK_REVIEW_MESSAGES[status]} successfully.",
+        )
+
+    def _bulk_review_with_reason(self, request, queryset, status, title):
+        form = ReviewReasonForm(request.POST if "apply" in request.POST else None)
+        if form.is_valid():
+            self._bulk_review(
+                request, queryset, status, reason=form.cleaned_data["reason"]
+            )
+            return None
+
+        context = {
+            **self.admin_site.each_context(request),
+            "title": title,
+            "opts": self.model._meta,
+            "form": form,
+            "action": request.POST["action"],
+            "account_count": queryset.count(),
+            "selected_ids": request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            "select_across": request.POST.get("select_across", "0"),
+            "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+        }
+        return TemplateResponse(
+            request, "admin/accounts/account/review_reason.html", context
+        )
+
+    def approve_accounts(self, request, queryset):
+        self._bulk_review(request, queryset, "approved")
 
     approve_accounts.short_description = "Approve selected accounts"
+
+    def reject_accounts(self, request, queryset):
+        return self._bulk_review_with_reason(
+            request, queryset, "rejected", "Reject selected accounts"
+        )
+
+    reject_accounts.short_description = "Reject selected accounts"
+
+    def request_additional_docs(self, request, queryset):
+        return self._bulk_review_with_reason(
+            request,
+            queryset,
+            "additional_docs_required",
+            "Request additional documents for selected accounts",
+        )
+
+    request_additional_docs.short_description = (
+        "Request additional documents for selected accounts"
+    )
+
+    def _export(self, request, queryset, file_format):
+        filename = f"accounts-{timezone.now():%Y%m%d-%H%M%S}.{file_format}"
+        return streaming_export_response(request, queryset, file_format, filename)
+
+    def export_csv(self, request, queryset):
+        return self._export(request, queryset, "csv")
+
+    export_csv.short_description = "Export selected accounts as CSV"
+    export_csv.allowed_permissions = ("view",)
+
+    def export_jsonl(self, request, queryset):
+        return self._export(request, queryset, "jsonl")
+
+    export_jsonl.short_description = "Export selected accounts as JSONL"
+    export_jsonl.allowed_permissions = ("view",)
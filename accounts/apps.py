@@ -4,3 +4,24 @@ from django.apps import AppConfig
 class AccountConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "accounts"
+
+    def ready(self):
+        from django.contrib.auth.models import User
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_delete, post_save
+
+        from accounts import cache, metrics, slow_queries
+        from accounts.models import Account
+
+        def user_changed(sender, instance, using, **kwargs):
+            cache.bump_user_accounts(instance.pk, using=using)
+            cache.reviewer_changed(instance.pk, using=using)
+
+        def account_deleted(sender, instance, using, **kwargs):
+            cache.bump_account_versions([instance.pk], using=using)
+
+        post_save.connect(user_changed, sender=User, weak=False)
+        post_delete.connect(user_changed, sender=User, weak=False)
+        post_delete.connect(account_deleted, sender=Account, weak=False)
+        connection_created.connect(metrics.install_query_recorder, weak=False)
+        connection_created.connect(slow_queries.install, weak=False)
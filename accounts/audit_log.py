@@ -0,0 +1,145 @@
+import logging
+import os
+import queue
+import sys
+import threading
+
+import orjson
+
+_sinks = []
+
+
+def dumps(obj, default=None, **kwargs):
+    """orjson serializer for structlog's JSONRenderer"""
+    return orjson.dumps(obj, default=default).decode()
+
+
+def sink_stats():
+    """Returns the queue depth and write counters of every audit sink"""
+    return [sink.stats() for sink in _sinks]
+
+
+class QueuedAuditHandler(logging.Handler):
+    """
+    Renders each record once in the calling thread and hands the line to a
+    background thread, which appends it in batches to ``filename`` and
+    optionally echoes it to stderr. When the queue is full the record is
+    dropped and counted instead of blocking the request.
+    """
+
+    _sentinel = object()
+
+    def __init__(
+        self,
+        filename,
+        console=False,
+        queue_size=10000,
+        batch_size=500,
+        flush_interval=0.5,
+    ):
+        super().__init__()
+        self.filename = os.fspath(filename)
+        self.console = console
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.written = 0
+        self.dropped = 0
+        self._stream = None
+        self._stream_id = None
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="audit-log-writer", daemon=True
+        )
+        self._thread.start()
+        _sinks.append(self)
+
+    def emit(self, record):
+        if self._closed:
+            return
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        try:
+            self.queue.put_nowait(line)
+        except queue.Full:
+            self.dropped += 1
+
+    def stats(self):
+        return {
+            "filename": self.filename,
+            "queue_depth": self.queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+        }
+
+    def flush(self):
+        """Blocks until everything queued so far has been written"""
+        if not self._closed and self._thread.is_alive():
+            self.queue.join()
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self.queue.put(self._sentinel)
+            self._thread.join(timeout=5)
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+            if self in _sinks:
+                _sinks.remove(self)
+        super().close()
+
+    def _run(self):
+        while True:
+            try:
+                batch = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(line is self._sentinel for line in batch)
+            lines = [line for line in batch if line is not self._sentinel]
+            if lines:
+                self._write(lines)
+            for _ in batch:
+                self.queue.task_done()
+            if stop:
+                return
+
+    def _write(self, lines):
+        data = "\n".join(lines) + "\n"
+        try:
+            stream = self._open_stream()
+            stream.write(data)
+            stream.flush()
+            if self.console:
+                sys.stderr.write(data)
+                sys.stderr.flush()
+        except Exception:
+            self.dropped += len(lines)
+            return
+        self.written += len(lines)
+
+    def _open_stream(self):
+        # Reopen once per batch when logrotate moved the file, like
+        # WatchedFileHandler does per record
+        try:
+            st = os.stat(self.filename)
+            current_id = (st.st_dev, st.st_ino)
+        except FileNotFoundError:
+            current_id = None
+
+        if self._stream is None or current_id != self._stream_id:
+            if self._stream is not None:
+                self._stream.close()
+            self._stream = open(self.filename, "a", encoding="utf-8")
+            st = os.fstat(self._stream.fileno())
+            self._stream_id = (st.st_dev, st.st_ino)
+        return self._stream
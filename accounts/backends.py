@@ -0,0 +1,39 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import PermissionDenied
+
+from accounts import hashing
+
+UserModel = get_user_model()
+
+
+class HashingModelBackend(ModelBackend):
+    """
+    ModelBackend that verifies passwords through accounts.hashing. A failed
+    password login raises PermissionDenied, which ends authenticate(), so the
+    ModelBackend listed after this one never hashes the password again.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Run the default password hasher once to reduce the timing
+            # difference between an existing and a nonexistent user (#20760).
+            hashing.make_password(password)
+        else:
+            if hashing.check_user_password(
+                user, password
+            ) and self.user_can_authenticate(user):
+                return user
+        raise PermissionDenied
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        return await sync_to_async(self.authenticate)(
+            request, username=username, password=password, **kwargs
+        )
@@ -0,0 +1,43 @@
+"""Helpers shared by the benchmark management commands."""
+
+import math
+import statistics
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values``"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(latencies_ms, elapsed_s):
+    """Throughput and latency distribution of one benchmark run"""
+    return {
+        "requests": len(latencies_ms),
+        "requests_per_s": len(latencies_ms) / elapsed_s if elapsed_s else 0.0,
+        "mean_ms": statistics.fmean(latencies_ms) if latencies_ms else 0.0,
+        "p50_ms": percentile(latencies_ms, 50),
+        "p95_ms": percentile(latencies_ms, 95),
+        "p99_ms": percentile(latencies_ms, 99),
+    }
+
+
+def format_table(rows, columns):
+    """Renders ``rows`` (dicts keyed by ``columns``) as a fixed-width table"""
+    widths = [
+        max([len(column), *(len(_format_cell(row[column])) for row in rows)])
+        for column in columns
+    ]
+    lines = ["  ".join(c.rjust(w) for c, w in zip(columns, widths))]
+    for row in rows:
+        lines.append(
+            "  ".join(_format_cell(row[c]).rjust(w) for c, w in zip(columns, widths))
+        )
+    return "\n".join(lines)
+
+
+def _format_cell(value):
+    return f"{value:.2f}" if isinstance(value, float) else str(value)
@@ -0,0 +1,150 @@
+"""
+Cross-worker cache of per-user Account snapshots.
+
+Every cached value is keyed by the account id plus a version token. Changing
+an account retires its token (after the transaction commits), and the next
+reader mints a new one, so stale snapshots are never read again by any
+worker sharing the cache.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.crypto import get_random_string
+
+
+def _cache():
+    return caches[settings.ACCOUNT_CACHE_ALIAS]
+
+
+def _user_key(user_id):
+    return f"account:user:{user_id}"
+
+
+def _version_key(account_id):
+    return f"account:{account_id}:version"
+
+
+def _value_key(account_id, version, name):
+    return f"account:{account_id}:{version}:{name}"
+
+
+def current_version(account_id):
+    """Returns the account's cache version, minting one if it was retired"""
+    cache = _cache()
+    version = cache.get(_version_key(account_id))
+    if version is None:
+        cache.add(_version_key(account_id), get_random_string(12), timeout=None)
+        version = cache.get(_version_key(account_id))
+    return version
+
+
+def bump_account_versions(account_ids, using=None):
+    """Retires the cached versions of ``account_ids`` once the change commits"""
+    keys = [_version_key(account_id) for account_id in account_ids]
+    if keys:
+        transaction.on_commit(lambda: _cache().delete_many(keys), using=using)
+
+
+def bump_user_accounts(user_id, using=None):
+    """
+    Retires the cached account of ``user_id``, e.g. after the user changed.
+    Saving or deleting a User does so through signals; code changing users
+    with update() or raw SQL must call it, or the snapshot keeps serving the
+    old is_active and password hash.
+    """
+    account_id = _cache().get(_user_key(user_id))
+    if account_id is not None:
+        bump_account_versions([account_id], using=using)
+
+
+def cached_account_id(user_id):
+    return _cache().get(_user_key(user_id))
+
+
+def get_account_snapshot(account_id, version):
+    """Returns the cached Account (user and reviewer loaded) or None"""
+    return _cache().get(_value_key(account_id, version, "snapshot"))
+
+
+def set_account_snapshot(account, version):
+    """
+    Caches ``account`` with its user, whose changes retire it through
+    bump_user_accounts(). ``version`` must have been read before the account
+    was loaded, so a concurrent change leaves this snapshot unreachable.
+    """
+    cache = _cache()
+    account._cache_version = version
+    cache.set_many(
+        {
+            _user_key(account.user_id): account.pk,
+            _value_key(account.pk, version, "snapshot"): account,
+        },
+        timeout=settings.ACCOUNT_CACHE_TIMEOUT,
+    )
+
+
+def remember_account_id(account):
+    _cache().set(
+        _user_key(account.user_id), account.pk, timeout=settings.ACCOUNT_CACHE_TIMEOUT
+    )
+
+
+def cached_rendering(account, name, build):
+    """
+    Returns ``build(account)``, cached alongside the account's snapshot. The
+    key also carries ``updated_at``, so a row changed behind the cache's back
+    is not served stale either.
+    """
+    version = getattr(account, "_cache_version", None)
+    if version is None:
+        return build(account)
+
+    key = _value_key(account.pk, version, f"{name}:{account.updated_at.timestamp()}")
+    cache = _cache()
+    value = cache.get(key)
+    if value is None:
+        value = build(account)
+        cache.set(key, value, timeout=settings.ACCOUNT_CACHE_TIMEOUT)
+    return value
+
+
+_REVIEWERS_KEY = "account:reviewers"
+
+
+def cached_reviewers(build):
+    """
+    Returns ``build()`` (the ``[(user_id, label)]`` of account reviewers, or
+    None when there are too many to list), cached until the list changes.
+    """
+    cache = _cache()
+    cached = cache.get(_REVIEWERS_KEY)
+    if cached is None:
+        cached = {"reviewers": build()}
+        cache.set(_REVIEWERS_KEY, cached, timeout=settings.ACCOUNT_CACHE_TIMEOUT)
+    return cached["reviewers"]
+
+
+def _cached_reviewer_ids():
+    cached = _cache().get(_REVIEWERS_KEY)
+    if cached is None or cached["reviewers"] is None:
+        return None
+    return {user_id for user_id, _ in cached["reviewers"]}
+
+
+def _retire_reviewers(using):
+    transaction.on_commit(lambda: _cache().delete(_REVIEWERS_KEY), using=using)
+
+
+def note_reviewer(user_id, using=None):
+    """Retires the cached reviewer list once ``user_id`` has reviewed an account"""
+    reviewer_ids = _cached_reviewer_ids()
+    if reviewer_ids is not None and user_id not in reviewer_ids:
+        _retire_reviewers(using)
+
+
+def reviewer_changed(user_id, using=None):
+    """Retires the cached reviewer list if it shows ``user_id``"""
+    reviewer_ids = _cached_reviewer_ids()
+    if reviewer_ids is not None and user_id in reviewer_ids:
+        _retire_reviewers(using)
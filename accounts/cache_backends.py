@@ -0,0 +1,29 @@
+import threading
+import time
+
+from django.core.cache.backends import filebased
+
+_next_cull = {}
+_cull_lock = threading.Lock()
+
+
+class FileBasedCache(filebased.FileBasedCache):
+    """
+    Django's FileBasedCache lists the whole cache directory to count its
+    entries on every set(). This one does so at most every ``CULL_INTERVAL``
+    seconds (OPTIONS, default 60) per process and directory, so the cache may
+    overshoot MAX_ENTRIES by what is written in between.
+    """
+
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        self._cull_interval = float(params.get("OPTIONS", {}).get("CULL_INTERVAL", 60))
+
+    def _cull(self):
+        # Caches are created per thread, so the schedule is kept per directory
+        now = time.monotonic()
+        with _cull_lock:
+            if now < _next_cull.get(self._dir, 0):
+                return
+            _next_cull[self._dir] = now + self._cull_interval
+        super()._cull()
@@ -0,0 +1,13 @@
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def pool_stats(using=DEFAULT_DB_ALIAS):
+    """
+    Returns this process's psycopg pool statistics for ``using`` (size,
+    connections available, requests waiting, total wait in ``requests_wait_ms``
+    and so on), or None when the connection is not pooled.
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql" or not connection.pool:
+        return None
+    return connection.pool.get_stats()
@@ -1,9 +1,37 @@
 from django import forms
-from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.forms import UserCreationForm, UsernameField
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError
 
+from accounts import hashing
 from accounts.models import Account
+from accounts.phone import (
+    INVALID_PHONE_MESSAGE,
+    normalize_phone,
+    validate_phone_number,
+)
+
+
+def check_phone_available(phone, account=None):
+    """
+    Rejects ``phone`` if it is invalid or another account has the same number
+    in any formatting, with one probe of the unique phone_normalized index.
+    The unchanged number of ``account`` is accepted as is, so duplicates that
+    migration 0006 left for manual review can still be reviewed.
+    """
+    if account is not None and account.pk is not None:
+        if phone == account.phone_number:
+            return phone
+    normalized = normalize_phone(phone)
+    if normalized is None:
+        raise ValidationError(INVALID_PHONE_MESSAGE, code="invalid")
+    duplicates = Account.objects.filter(phone_normalized=normalized)
+    if account is not None and account.pk is not None:
+        duplicates = duplicates.exclude(pk=account.pk)
+    if duplicates.exists():
+        raise ValidationError(Account().unique_error_message(Account, ["phone_number"]))
+    return phone
 
 
 class CombinedRegistrationForm(UserCreationForm):
@@ -12,7 +40,9 @@ class CombinedRegistrationForm(UserCreationForm):
     last_name = forms.CharField(max_length=30, required=True)
 
     # Account fields
-    phone_number = forms.CharField(max_length=20, required=True)
+    phone_number = forms.CharField(
+        max_length=20, required=True, validators=[validate_phone_number]
+    )
     address = forms.CharField(widget=forms.Textarea(attrs={"rows": 4}), required=True)
 
     class Meta:
@@ -33,19 +63,22 @@ class CombinedRegistrationForm(UserCreationForm):
             field.widget.attrs["class"] = "form-control"
 
     def clean_phone_number(self):
-        phone = self.cleaned_data.get("phone_number")
-        if phone:
-            # Basic phone number validation
-            if (
-                not phone.replace("-", "")
-                .replace(" ", "")
-                .replace("(", "")
-                .replace(")", "")
-                .replace("+", "")
-                .isdigit()
-            ):
-                raise ValidationError("Please enter a valid phone number")
-        return phone
+        return check_phone_available(self.cleaned_data["phone_number"])
+
+    def validate_unique(self):
+        # clean_username() has already rejected usernames that differ only in
+        # case, which covers the exact match ModelForm would query again
+        exclude = self._get_validation_exclusions() | {"username"}
+        try:
+            self.instance.validate_unique(exclude=exclude)
+        except ValidationError as e:
+            self._update_errors(e)
+
+    def set_password_and_save(self, user, password_field_name="password1", commit=True):
+        hashing.set_password(user, self.cleaned_data[password_field_name])
+        if commit:
+            user.save()
+        return user
 
     def save(self, commit=True):
         user = super().save(commit=False)
@@ -53,7 +86,13 @@ class CombinedRegistrationForm(UserCreationForm):
         user.first_name = self.cleaned_data["first_name"]
         user.last_name = self.cleaned_data["last_name"]
         if commit:
-            user.save()
+            try:
+                user.save()
+            except IntegrityError as e:
+                # Another registration took the username after validation
+                raise ValidationError(
+                    {"username": user.unique_error_message(User, ["username"])}
+                ) from e
         return user
 
 
@@ -67,16 +106,30 @@ class AccountForm(forms.ModelForm):
         }
 
     def clean_phone_number(self):
-        phone = self.cleaned_data.get("phone_number")
-        if phone:
-            # Basic phone number validation
-            if (
-                not phone.replace("-", "")
-                .replace(" ", "")
-                .replace("(", "")
-                .replace(")", "")
-                .replace("+", "")
-                .isdigit()
-            ):
-                raise ValidationError("Please enter a valid phone number")
-        return phone
+        return check_phone_available(
+            self.cleaned_data["phone_number"], account=self.instance
+        )
+
+
+class AccountImportForm(forms.ModelForm):
+    """
+    Validates one row of a bulk import with the rules of
+    CombinedRegistrationForm, minus the passwords. Uniqueness is checked by
+    the import for a whole batch at once.
+    """
+
+    email = forms.EmailField(required=True)
+    first_name = forms.CharField(max_length=30, required=True)
+    last_name = forms.CharField(max_length=30, required=True)
+    phone_number = forms.CharField(
+        max_length=20, required=True, validators=[validate_phone_number]
+    )
+    address = forms.CharField(required=True)
+
+    class Meta:
+        model = User
+        fields = ("username", "first_name", "last_name", "email")
+        field_classes = {"username": UsernameField}
+
+    def validate_unique(self):
+        pass
@@ -0,0 +1,127 @@
+"""
+Password hashing off the request path.
+
+PBKDF2, scrypt and argon2 are deliberately CPU-heavy. With
+``PASSWORD_HASHING_WORKERS`` set, hashes are computed in a dedicated process
+pool sized independently of the request threads, and at most
+``PASSWORD_HASHING_MAX_PENDING`` hashes may be queued or running at once;
+further callers wait for a slot. With no workers configured hashing runs
+inline, as Django does by default.
+"""
+
+import atexit
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth import hashers
+
+_lock = threading.Lock()
+_executor = None
+_slots = None
+_stats = {}
+
+
+def _init_worker():
+    django.setup()
+
+
+def _check(raw_password, encoded):
+    """Returns ``(is_correct, must_update)`` like hashers.check_password()"""
+    must_update = []
+    is_correct = hashers.check_password(
+        raw_password, encoded, setter=lambda raw: must_update.append(True)
+    )
+    return is_correct, bool(must_update)
+
+
+def _get_executor():
+    global _executor, _slots
+    with _lock:
+        if _executor is None and settings.PASSWORD_HASHING_WORKERS > 0:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASHING_WORKERS,
+                # Forking a threaded server process is unsafe
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+            _slots = threading.BoundedSemaphore(
+                settings.PASSWORD_HASHING_MAX_PENDING
+                or settings.PASSWORD_HASHING_WORKERS * 4
+            )
+            atexit.register(shutdown)
+        return _executor
+
+
+def shutdown():
+    """Stops the worker processes; the next hash starts a new pool"""
+    global _executor, _slots
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+            _slots = None
+
+
+def _run(operation, func, *args):
+    started = time.perf_counter()
+    executor = _get_executor()
+    if executor is None:
+        result = func(*args)
+    else:
+        with _slots:
+            result = executor.submit(func, *args).result()
+    _record(operation, (time.perf_counter() - started) * 1000)
+    return result
+
+
+def _record(operation, elapsed_ms):
+    with _lock:
+        stats = _stats.setdefault(
+            operation, {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+        )
+        stats["count"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+
+def hashing_stats():
+    """Per-operation count, mean and max latency (queue wait included) in ms"""
+    with _lock:
+        return {
+            operation: {**stats, "mean_ms": stats["total_ms"] / stats["count"]}
+            for operation, stats in _stats.items()
+        }
+
+
+def make_password(raw_password):
+    return _run("make_password", hashers.make_password, raw_password)
+
+
+def check_password(raw_password, encoded):
+    return _run("check_password", _check, raw_password, encoded)[0]
+
+
+def set_password(user, raw_password):
+    """Like User.set_password(), with the hash computed by the pool"""
+    user.password = make_password(raw_password)
+    # Lets password validators' password_changed() run after save()
+    user._password = raw_password
+
+
+def check_user_password(user, raw_password):
+    """
+    Like User.check_password(): also rehashes and saves the password when the
+    preferred hasher or its work factor changed.
+    """
+    is_correct, must_update = _run(
+        "check_password", _check, raw_password, user.password
+    )
+    if is_correct and must_update:
+        set_password(user, raw_password)
+        user._password = None
+        user.save(update_fields=["password"])
+    return is_correct
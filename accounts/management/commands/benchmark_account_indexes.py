@@ -0,0 +1,128 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounts.models import Account
+from accounts.seeding import seed_accounts
+
+
+def hot_queries(reviewer_id):
+    """The Account queries behind the admin changelist and its filters"""
+    ordered = Account.objects.order_by("-created_at", "-id")
+    return {
+        "changelist": ordered[:25],
+        "status_filter": ordered.filter(status="pending")[:25],
+        "review_queue": ordered.filter(
+            status__in=["pending", "additional_docs_required"]
+        )[:25],
+        "reviewer_filter": ordered.filter(reviewed_by_id=reviewer_id)[:25],
+        "updated_last_week": ordered.filter(
+            updated_at__gte=timezone.now() - timedelta(days=7)
+        )[:25],
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds accounts and compares EXPLAIN plans and timings of the hot "
+        "Account queries without and with the Account indexes. Seeded rows "
+        "are rolled back unless --keep is given. Dropping the indexes locks the "
+        "account table until the command ends, so it refuses to run with "
+        "IS_DEPLOYED=true unless --force is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100_000)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument(
+            "--keep", action="store_true", help="Commit the seeded accounts."
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Run against a deployed database, blocking account requests.",
+        )
+
+    def handle(self, *args, **options):
+        if settings.IS_DEPLOYED and not options["force"]:
+            raise CommandError(
+                "Refusing to drop the Account indexes of a deployed database: "
+                "the table stays locked for the whole benchmark. Run it against "
+                "a scratch database, or pass --force."
+            )
+        with transaction.atomic():
+            reviewers = [
+                User.objects.create_user(f"bench_reviewer_{i}", is_staff=True)
+                for i in range(5)
+            ]
+            started = time.perf_counter()
+            seed_accounts(options["rows"], reviewers=reviewers, seed=options["seed"])
+            self.stdout.write(
+                f"Seeded {options['rows']} accounts in "
+                f"{time.perf_counter() - started:.1f}s"
+            )
+            self._analyze()
+
+            queries = hot_queries(reviewers[0].pk)
+            with transaction.atomic():
+                self._drop_account_indexes()
+                before = self._measure(queries, options["repeat"])
+                transaction.set_rollback(True)
+            after = self._measure(queries, options["repeat"])
+
+            self._report(before, after)
+            if not options["keep"]:
+                transaction.set_rollback(True)
+
+    def _analyze(self):
+        table = connection.ops.quote_name(Account._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"ANALYZE {table}" if connection.vendor == "postgresql" else "ANALYZE"
+            )
+
+    def _drop_account_indexes(self):
+        """Recreates the schema as it was before the Account indexes migration"""
+        qn = connection.ops.quote_name
+        table = qn(Account._meta.db_table)
+        column = qn(Account._meta.get_field("reviewed_by").column)
+        with connection.cursor() as cursor:
+            for index in Account._meta.indexes:
+                cursor.execute(f"DROP INDEX {qn(index.name)}")
+            cursor.execute(
+                f"CREATE INDEX {qn('bench_reviewed_by_idx')} ON {table} ({column})"
+            )
+        self._analyze()
+
+    def _measure(self, queries, repeat):
+        results = {}
+        for name, queryset in queries.items():
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = {
+                "median_ms": statistics.median(timings),
+                "plan": queryset.explain(),
+            }
+        return results
+
+    def _report(self, before, after):
+        self.stdout.write(f"\n{'query':<20}{'before (ms)':>14}{'after (ms)':>14}")
+        for name in before:
+            self.stdout.write(
+                f"{name:<20}{before[name]['median_ms']:>14.2f}"
+                f"{after[name]['median_ms']:>14.2f}"
+            )
+        for name in before:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{name}"))
+            self.stdout.write("before:\n" + before[name]["plan"])
+            self.stdout.write("after:\n" + after[name]["plan"])
@@ -0,0 +1,108 @@
+import json
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils.crypto import get_random_string
+
+from accounts.bench import format_table, summarize
+from accounts.models import Account
+
+
+class Command(BaseCommand):
+    help = (
+        "Logs a benchmark user in under each SESSION_PROFILE and reports the "
+        "database queries and latency of the login and of each account status "
+        "request. The benchmark user is removed afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--profiles", default=",".join(settings.SESSION_ENGINES))
+        parser.add_argument("--json", action="store_true", help="Print JSON.")
+
+    def handle(self, *args, **options):
+        profiles = options["profiles"].split(",")
+        unknown = set(profiles) - set(settings.SESSION_ENGINES)
+        if unknown:
+            raise CommandError(f"Unknown session profiles: {', '.join(unknown)}")
+
+        token = get_random_string(6).lower()
+        user = User.objects.create(username=f"bench_sessions_{token}")
+        Account.objects.create(
+            user=user,
+            phone_number=f"+9{get_random_string(10, allowed_chars='0123456789')}",
+            address="1 Benchmark St",
+        )
+        try:
+            with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+            ):
+                results = [
+                    self._run(profile, user, options["requests"])
+                    for profile in profiles
+                ]
+        finally:
+            user.delete()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(
+            format_table(
+                results,
+                [
+                    "profile",
+                    "login_queries",
+                    "login_ms",
+                    "queries_per_request",
+                    "requests_per_s",
+                    "p50_ms",
+                    "p95_ms",
+                    "p99_ms",
+                ],
+            )
+        )
+
+    def _run(self, profile, user, total):
+        with override_settings(SESSION_ENGINE=settings.SESSION_ENGINES[profile]):
+            client = Client()
+            login_ms, login_queries = _measure(lambda: client.force_login(user))
+            path = reverse("account_status")
+            # The first hit learns the account id and the second caches the
+            # account, so only the session lookup is left
+            client.get(path)
+            client.get(path)
+
+            latencies = []
+            queries = []
+            started = time.perf_counter()
+            for _ in range(total):
+                elapsed_ms, count = _measure(lambda: client.get(path))
+                latencies.append(elapsed_ms)
+                queries.append(count)
+            elapsed = time.perf_counter() - started
+            client.logout()
+
+        return {
+            "profile": profile,
+            "login_queries": login_queries,
+            "login_ms": login_ms,
+            "queries_per_request": statistics.fmean(queries),
+            **summarize(latencies, elapsed),
+        }
+
+
+def _measure(request):
+    """Returns the milliseconds and database queries ``request()`` took"""
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        request()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    return elapsed_ms, len(queries)
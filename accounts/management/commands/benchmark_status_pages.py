@@ -0,0 +1,142 @@
+import json
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from accounts.bench import format_table, summarize
+from accounts.cache import cached_rendering
+from accounts.models import Account
+from accounts.views import render_account_status, render_congratulations
+
+PAGES = {
+    "account_status": (
+        "accounts/account_status.html",
+        render_account_status,
+        ["pending", "rejected", "additional_docs_required"],
+    ),
+    "congratulations": (
+        "accounts/congratulations.html",
+        render_congratulations,
+        ["approved"],
+    ),
+}
+
+# "before" renders everything on every hit; "after" serves the account's part
+# from a warm cache. Both use a process-local cache so the configured shared
+# cache is left alone; its round trip is measured end to end by
+# benchmark_views.
+MODES = {
+    "before": "django.core.cache.backends.dummy.DummyCache",
+    "after": "django.core.cache.backends.locmem.LocMemCache",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Renders the account status and congratulations pages without and "
+        "with the per-account cached rendering and reports render times. "
+        "Benchmark accounts are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--accounts", type=int, default=200)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--json", action="store_true", help="Print JSON.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            accounts = self._create_accounts(options["accounts"])
+            results = []
+            for mode, backend in MODES.items():
+                caches = {alias: {"BACKEND": backend} for alias in settings.CACHES}
+                with override_settings(CACHES=caches):
+                    for page, (template, build, _) in PAGES.items():
+                        page_accounts = [a for a in accounts if a.page == page]
+                        # Warm up, which fills the cache in the "after" mode
+                        self._render(page_accounts, template, build)
+                        latencies, elapsed = [], 0.0
+                        for _ in range(options["repeat"]):
+                            run, run_elapsed = self._render(
+                                page_accounts, template, build
+                            )
+                            latencies += run
+                            elapsed += run_elapsed
+                        results.append(
+                            {
+                                "page": page,
+                                "mode": mode,
+                                **summarize(latencies, elapsed),
+                            }
+                        )
+            transaction.set_rollback(True)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(
+            format_table(
+                results,
+                ["page", "mode", "requests", "mean_ms", "p50_ms", "p95_ms", "p99_ms"],
+            )
+        )
+
+    def _create_accounts(self, count):
+        statuses = [status for _, _, page in PAGES.values() for status in page]
+        reviewer = User.objects.create_user("bench_pages_reviewer", is_staff=True)
+        now = timezone.now()
+        accounts = []
+        for i in range(count):
+            user = User.objects.create_user(f"bench_pages_{i}")
+            status = statuses[i % len(statuses)]
+            account = Account.objects.create(
+                user=user,
+                phone_number=f"+9{i:010d}",
+                address="1 Benchmark St",
+                status=status,
+                rejection_reason="Incomplete" if status == "rejected" else "",
+                additional_docs_reason="Proof of address"
+                if status == "additional_docs_required"
+                else "",
+                approved_at=now if status == "approved" else None,
+                reviewed_by=None if status == "pending" else reviewer,
+                reviewed_at=None if status == "pending" else now,
+            )
+            accounts.append(account.pk)
+
+        factory = RequestFactory()
+        loaded = []
+        for account in Account.objects.select_related("user", "reviewed_by").filter(
+            pk__in=accounts
+        ):
+            # As if served from the snapshot cache; a fixed token keeps the
+            # configured cache out of it
+            account._cache_version = "benchmark"
+            account.page = next(
+                page
+                for page, (_, _, statuses) in PAGES.items()
+                if account.status in statuses
+            )
+            account.request = factory.get("/")
+            account.request.user = account.user
+            loaded.append(account)
+        return loaded
+
+    def _render(self, accounts, template, build):
+        latencies = []
+        started = time.perf_counter()
+        for account in accounts:
+            rendered_at = time.perf_counter()
+            render_to_string(
+                template,
+                {"content": cached_rendering(account, account.page, build)},
+                request=account.request,
+            )
+            latencies.append((time.perf_counter() - rendered_at) * 1000)
+        return latencies, time.perf_counter() - started
@@ -0,0 +1,152 @@
+import asyncio
+import itertools
+import json
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils.crypto import get_random_string
+
+from accounts.bench import format_table, summarize
+from accounts.db import pool_stats
+from accounts.models import Account
+
+DEFAULT_VIEWS = ["account_status", "congratulations", "home", "supplement_form"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Drives the account views in-process through the ASGI or WSGI handler "
+        "at a fixed concurrency and reports requests/s and latency percentiles "
+        "per view. Run it on two revisions to compare them; benchmark users are "
+        "removed afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--handler", choices=["asgi", "wsgi"], default="asgi")
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--views", default=",".join(DEFAULT_VIEWS))
+        parser.add_argument("--json", action="store_true", help="Print JSON.")
+
+    def handle(self, *args, **options):
+        paths = {name: reverse(name) for name in options["views"].split(",")}
+        users = self._create_users(options["concurrency"])
+        try:
+            with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+            ):
+                if options["handler"] == "asgi":
+                    latencies, elapsed = asyncio.run(
+                        self._run_asgi(users, paths, options["requests"])
+                    )
+                else:
+                    latencies, elapsed = self._run_wsgi(
+                        users, paths, options["requests"]
+                    )
+        finally:
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+        results = {
+            "handler": options["handler"],
+            "concurrency": options["concurrency"],
+            "total": summarize(list(itertools.chain(*latencies.values())), elapsed),
+            "views": {name: summarize(latencies[name], elapsed) for name in latencies},
+            # Includes the time requests waited for a pooled connection
+            "db_pool": pool_stats(),
+        }
+        self._report(results, options["json"])
+
+    def _create_users(self, count):
+        token = get_random_string(6).lower()
+        phone_token = get_random_string(8, allowed_chars="0123456789")
+        users = []
+        for i in range(count):
+            user = User.objects.create(username=f"bench_views_{token}_{i}")
+            Account.objects.create(
+                user=user,
+                phone_number=f"+9{phone_token}{i:06d}",
+                address="1 Benchmark St",
+                status="approved" if i % 2 else "pending",
+            )
+            users.append(user)
+        return users
+
+    async def _run_asgi(self, users, paths, total):
+        clients = []
+        for user in users:
+            client = AsyncClient()
+            await client.aforce_login(user)
+            clients.append(client)
+
+        counter = itertools.count()
+        latencies = defaultdict(list)
+        names = list(paths)
+
+        async def virtual_user(client):
+            while (i := next(counter)) < total:
+                name = names[i % len(names)]
+                started = time.perf_counter()
+                await client.get(paths[name])
+                latencies[name].append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(virtual_user(client) for client in clients))
+        return latencies, time.perf_counter() - started
+
+    def _run_wsgi(self, users, paths, total):
+        counter = itertools.count()
+        latencies = defaultdict(list)
+        names = list(paths)
+
+        clients = []
+        for user in users:
+            client = Client()
+            client.force_login(user)
+            clients.append(client)
+
+        def virtual_user(client):
+            try:
+                while (i := next(counter)) < total:
+                    name = names[i % len(names)]
+                    started = time.perf_counter()
+                    client.get(paths[name])
+                    latencies[name].append((time.perf_counter() - started) * 1000)
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(clients)) as executor:
+            list(executor.map(virtual_user, clients))
+        return latencies, time.perf_counter() - started
+
+    def _report(self, results, as_json):
+        if as_json:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        rows = [{"view": "total", **results["total"]}] + [
+            {"view": name, **summary} for name, summary in results["views"].items()
+        ]
+        self.stdout.write(
+            f"{results['handler']} handler, concurrency {results['concurrency']}\n"
+        )
+        self.stdout.write(
+            format_table(
+                rows,
+                ["view", "requests", "requests_per_s", "p50_ms", "p95_ms", "p99_ms"],
+            )
+        )
+        if results["db_pool"] is not None:
+            stats = results["db_pool"]
+            self.stdout.write(
+                f"\nConnection pool: {stats.get('pool_size', 0)} connections, "
+                f"{stats.get('requests_queued', 0)} requests waited "
+                f"{stats.get('requests_wait_ms', 0)} ms in total"
+            )
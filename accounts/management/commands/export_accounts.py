@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from accounts.exports import EXPORT_FORMATS, export_rows, render
+from accounts.models import Account
+
+
+class Command(BaseCommand):
+    help = (
+        "Streams every account, or those with the given statuses, as CSV or "
+        "JSONL to a file or stdout. Rows are read with a server-side cursor, so "
+        "memory use does not grow with the table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="csv")
+        parser.add_argument("--output", help="Defaults to stdout.")
+        parser.add_argument(
+            "--status",
+            action="append",
+            choices=[value for value, _ in Account.STATUS_CHOICES],
+            help="Only export accounts with this status; may be repeated.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        queryset = Account.objects.order_by("pk")
+        if options["status"]:
+            queryset = queryset.filter(status__in=options["status"])
+        chunks = render(
+            export_rows(queryset, chunk_size=options["chunk_size"]), options["format"]
+        )
+
+        if options["output"]:
+            with open(options["output"], "w", newline="", encoding="utf-8") as output:
+                output.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
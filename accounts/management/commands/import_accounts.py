@@ -0,0 +1,357 @@
+import csv
+import itertools
+import json
+import os
+import time
+
+import structlog
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, connection, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from accounts.forms import AccountImportForm
+from accounts.models import Account, AccountStatusEvent
+from accounts.phone import normalize_phone
+
+logger = structlog.get_logger(__name__)
+
+IMPORT_FIELDS = [
+    "username",
+    "email",
+    "first_name",
+    "last_name",
+    "phone_number",
+    "address",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports account applications from a CSV (with a header row) or JSONL "
+        f"file with the columns {', '.join(IMPORT_FIELDS)}. The file is "
+        "streamed in batches; each row is validated like the registration form "
+        "and rejected rows are written, with their errors, to a JSONL sidecar "
+        "file. Imported users get an unusable password."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "jsonl"],
+            help="Defaults to jsonl for .jsonl/.ndjson files, otherwise csv.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--rejects", help="Sidecar file, defaults to <path>.rejects.jsonl."
+        )
+        parser.add_argument(
+            "--no-copy",
+            action="store_true",
+            help="Insert with bulk_create instead of COPY on PostgreSQL.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or (
+            "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+        )
+        rejects_path = options["rejects"] or f"{path}.rejects.jsonl"
+        use_copy = connection.vendor == "postgresql" and not options["no_copy"]
+        if use_copy:
+            from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+            # psycopg2 has no Cursor.copy()
+            use_copy = is_psycopg3
+
+        imported = rejected = 0
+        started = time.perf_counter()
+        try:
+            source = open(path, newline="", encoding="utf-8")
+        except OSError as e:
+            raise CommandError(f"Cannot read {path}: {e}")
+        try:
+            with source, open(rejects_path, "w", encoding="utf-8") as rejects:
+                rows = _read_rows(source, file_format)
+                while batch := list(itertools.islice(rows, options["batch_size"])):
+                    accepted, failed = _validate_batch(batch)
+                    if accepted:
+                        conflicts = _insert_or_split(accepted, use_copy)
+                        imported += len(accepted) - len(conflicts)
+                        failed += conflicts
+                    for line, raw, errors in failed:
+                        rejects.write(
+                            json.dumps({"line": line, "row": raw, "errors": errors})
+                            + "\n"
+                        )
+                    rejected += len(failed)
+        except CommandError:
+            # The file could not be read at all, e.g. for missing CSV columns
+            os.remove(rejects_path)
+            raise
+
+        if not rejected:
+            os.remove(rejects_path)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"Imported {imported} accounts and rejected {rejected} rows "
+            f"in {elapsed:.1f}s ({imported / elapsed if elapsed else 0:.0f} rows/s)."
+        )
+        if rejected:
+            self.stdout.write(f"Rejected rows were written to {rejects_path}")
+
+
+def _read_rows(source, file_format):
+    """Yields ``(line_number, row)``; ``row`` is None for unparsable lines"""
+    if file_format == "csv":
+        reader = csv.DictReader(source)
+        missing = set(IMPORT_FIELDS) - set(reader.fieldnames or ())
+        if missing:
+            raise CommandError(f"Missing CSV columns: {', '.join(sorted(missing))}")
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(source, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+
+
+def _validate_batch(batch):
+    """
+    Splits a batch into ``(line, raw, cleaned_data)`` rows to insert and
+    ``(line, raw, errors)`` rejects. Usernames and phone numbers are checked
+    against the database with one query each for the whole batch.
+    """
+    valid = []
+    failed = []
+    for line, raw in batch:
+        if raw is None:
+            failed.append((line, raw, {"__all__": ["Invalid JSON object"]}))
+            continue
+        form = AccountImportForm(data=raw)
+        if form.is_valid():
+            valid.append((line, raw, form.cleaned_data))
+        else:
+            failed.append((line, raw, {f: list(e) for f, e in form.errors.items()}))
+
+    # Usernames differing only in case are rejected, as on registration
+    existing_usernames = set(
+        User.objects.annotate(username_lower=Lower("username"))
+        .filter(username_lower__in=[data["username"].lower() for _, _, data in valid])
+        .values_list("username_lower", flat=True)
+    )
+    for _, _, data in valid:
+        data["phone_normalized"] = normalize_phone(data["phone_number"])
+    existing_phones = set(
+        Account.objects.filter(
+            phone_normalized__in=[data["phone_normalized"] for _, _, data in valid]
+        ).values_list("phone_normalized", flat=True)
+    )
+    username_taken = list(User().unique_error_message(User, ["username"]))
+    phone_taken = list(Account().unique_error_message(Account, ["phone_number"]))
+
+    accepted = []
+    seen_usernames = existing_usernames
+    seen_phones = existing_phones
+    for line, raw, data in valid:
+        errors = {}
+        if data["username"].lower() in seen_usernames:
+            errors["username"] = username_taken
+        if data["phone_normalized"] in seen_phones:
+            errors["phone_number"] = phone_taken
+        if errors:
+            failed.append((line, raw, errors))
+            continue
+        seen_usernames.add(data["username"].lower())
+        seen_phones.add(data["phone_normalized"])
+        accepted.append((line, raw, data))
+    return accepted, failed
+
+
+def _insert_or_split(rows, use_copy):
+    """
+    Inserts ``rows`` and returns the ``(line, raw, errors)`` of those the
+    database refused. A batch that loses a race with a concurrent
+    registration is split in halves until only the conflicting rows are left.
+    """
+    try:
+        _insert(rows, use_copy)
+    except IntegrityError as e:
+        if len(rows) == 1:
+            line, raw, _ = rows[0]
+            return [(line, raw, {"__all__": [str(e)]})]
+        middle = len(rows) // 2
+        return _insert_or_split(rows[:middle], use_copy) + _insert_or_split(
+            rows[middle:], use_copy
+        )
+    return []
+
+
+def _insert(rows, use_copy):
+    now = timezone.now()
+    # Imported applicants cannot log in until a password is set for them
+    password = make_password(None)
+    with transaction.atomic():
+        if use_copy:
+            ids = _copy_rows(rows, password, now)
+        else:
+            ids = _bulk_create_rows(rows, password, now)
+
+    for (_, _, data), (user_id, account_id) in zip(rows, ids):
+        logger.info(
+            "new_account_created",
+            user_id=user_id,
+            username=data["username"],
+            user_email=data["email"],
+            account_id=account_id,
+            status="pending",
+            phone_number=data["phone_number"],
+            address=data["address"],
+            created_at=now.isoformat(),
+            event_type="account_creation",
+            change_method="import",
+        )
+
+
+def _bulk_create_rows(rows, password, now):
+    """Returns ``(user_id, account_id)`` pairs in the order of ``rows``"""
+    users = User.objects.bulk_create(
+        User(
+            username=data["username"],
+            email=data["email"],
+            first_name=data["first_name"],
+            last_name=data["last_name"],
+            password=password,
+            date_joined=now,
+        )
+        for _, _, data in rows
+    )
+    accounts = Account.objects.bulk_create(
+        Account(
+            user=user,
+            phone_number=data["phone_number"],
+            phone_normalized=data["phone_normalized"],
+            address=data["address"],
+        )
+        for user, (_, _, data) in zip(users, rows)
+    )
+    AccountStatusEvent.objects.bulk_create(
+        AccountStatusEvent(
+            account=account, new_status=account.status, change_method="import"
+        )
+        for account in accounts
+    )
+    return [(account.user_id, account.pk) for account in accounts]
+
+
+def _copy_rows(rows, password, now):
+    """
+    PostgreSQL fast path: COPY each table, then map the keys back by the
+    unique username and normalized phone number. Returns ``(user_id, account_id)`` pairs.
+    """
+    data = [row[2] for row in rows]
+    with connection.cursor() as cursor:
+        _copy(
+            cursor,
+            User,
+            [
+                "password",
+                "is_superuser",
+                "username",
+                "first_name",
+                "last_name",
+                "email",
+                "is_staff",
+                "is_active",
+                "date_joined",
+            ],
+            (
+                (
+                    password,
+                    False,
+                    d["username"],
+                    d["first_name"],
+                    d["last_name"],
+                    d["email"],
+                    False,
+                    True,
+                    now,
+                )
+                for d in data
+            ),
+        )
+        user_ids = dict(
+            User.objects.filter(username__in=[d["username"] for d in data]).values_list(
+                "username", "pk"
+            )
+        )
+        _copy(
+            cursor,
+            Account,
+            [
+                "user",
+                "phone_number",
+                "phone_normalized",
+                "address",
+                "status",
+                "created_at",
+                "updated_at",
+            ],
+            (
+                (
+                    user_ids[d["username"]],
+                    d["phone_number"],
+                    d["phone_normalized"],
+                    d["address"],
+                    "pending",
+                    now,
+                    now,
+                )
+                for d in data
+            ),
+        )
+        account_ids = dict(
+            Account.objects.filter(
+                phone_normalized__in=[d["phone_normalized"] for d in data]
+            ).values_list("phone_normalized", "pk")
+        )
+        account_ids = [account_ids[d["phone_normalized"]] for d in data]
+        _copy(
+            cursor,
+            AccountStatusEvent,
+            [
+                "account",
+                "previous_status",
+                "new_status",
+                "change_method",
+                "reason",
+                "created_at",
+            ],
+            (
+                (account_id, "", "pending", "import", "", now)
+                for account_id in account_ids
+            ),
+        )
+    return [(user_ids[d["username"]], pk) for d, pk in zip(data, account_ids)]
+
+
+def _copy(cursor, model, field_names, rows):
+    qn = connection.ops.quote_name
+    columns = ", ".join(qn(model._meta.get_field(name).column) for name in field_names)
+    # Django's cursor wrapper does not translate the errors of copy(), so a
+    # unique violation would not be an IntegrityError without this
+    with connection.wrap_database_errors:
+        with cursor.copy(
+            f"COPY {qn(model._meta.db_table)} ({columns}) FROM STDIN"
+        ) as copy:
+            for row in rows:
+                copy.write_row(row)
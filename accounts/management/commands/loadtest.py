@@ -0,0 +1,162 @@
+import asyncio
+import itertools
+import json
+import time
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import override_settings
+from django.urls import resolve, reverse
+from django.utils.crypto import get_random_string
+
+from accounts.bench import format_table, summarize
+from accounts.models import Account
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs scripted applicant journeys in-process through the ASGI handler "
+        "against the configured database: register, poll account_status, get "
+        "approved by a reviewer in the admin, then open congratulations. "
+        "Reports throughput and latency percentiles per URL name; users it "
+        "creates are removed afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--journeys", type=int, default=100)
+        parser.add_argument("--concurrency", type=int, default=10)
+        parser.add_argument(
+            "--polls",
+            type=int,
+            default=5,
+            help="account_status requests before and after the approval.",
+        )
+        parser.add_argument("--json", action="store_true", help="Print JSON.")
+
+    def handle(self, *args, **options):
+        token = get_random_string(6).lower()
+        prefix = f"loadtest_{token}_"
+        reviewer = User.objects.create_superuser(f"{prefix}reviewer")
+        try:
+            with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+            ):
+                latencies, errors, elapsed = asyncio.run(
+                    self._run(reviewer, prefix, options)
+                )
+        finally:
+            User.objects.filter(username__startswith=prefix).delete()
+
+        results = {
+            "handler": "asgi",
+            "database": connection.vendor,
+            "journeys": options["journeys"],
+            "concurrency": options["concurrency"],
+            "elapsed_s": elapsed,
+            "total": {
+                **summarize(list(itertools.chain(*latencies.values())), elapsed),
+                "errors": sum(errors.values()),
+            },
+            "urls": {
+                name: {**summarize(latencies[name], elapsed), "errors": errors[name]}
+                for name in latencies
+            },
+        }
+        self._report(results, options["json"])
+
+    async def _run(self, reviewer, prefix, options):
+        reviewer_client = AsyncClient()
+        await reviewer_client.aforce_login(reviewer)
+        phone_token = get_random_string(8, allowed_chars="0123456789")
+        counter = itertools.count()
+        latencies = defaultdict(list)
+        errors = defaultdict(int)
+
+        async def request(client, method, path, data=None, expected=200):
+            """Times one request; any other status than ``expected`` is an error"""
+            name = resolve(path).view_name
+            started = time.perf_counter()
+            response = await getattr(client, method)(path, data)
+            latencies[name].append((time.perf_counter() - started) * 1000)
+            if response.status_code != expected:
+                errors[name] += 1
+            return response
+
+        async def journey(i):
+            client = AsyncClient()
+            username = f"{prefix}{i}"
+            await request(client, "get", reverse("register"))
+            await request(
+                client,
+                "post",
+                reverse("register"),
+                {
+                    "username": username,
+                    "first_name": "Load",
+                    "last_name": "Test",
+                    "email": f"{username}@example.com",
+                    "password1": "loadtest-pass-123",
+                    "password2": "loadtest-pass-123",
+                    "phone_number": f"+9{phone_token}{i:06d}",
+                    "address": "1 Load Test St",
+                },
+                expected=302,
+            )
+            for _ in range(options["polls"]):
+                await request(client, "get", reverse("account_status"))
+
+            account_id = await sync_to_async(
+                Account.objects.filter(user__username=username)
+                .values_list("pk", flat=True)
+                .first
+            )()
+            await request(
+                reviewer_client,
+                "post",
+                reverse("admin:accounts_account_changelist"),
+                {"action": "approve_accounts", ACTION_CHECKBOX_NAME: [account_id]},
+                expected=302,
+            )
+
+            for _ in range(options["polls"]):
+                await request(client, "get", reverse("congratulations"))
+
+        async def virtual_user():
+            while (i := next(counter)) < options["journeys"]:
+                await journey(i)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(virtual_user() for _ in range(options["concurrency"])))
+        return latencies, errors, time.perf_counter() - started
+
+    def _report(self, results, as_json):
+        if as_json:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        rows = [{"url": "total", **results["total"]}] + [
+            {"url": name, **summary} for name, summary in results["urls"].items()
+        ]
+        self.stdout.write(
+            f"{results['journeys']} journeys on {results['database']}, "
+            f"concurrency {results['concurrency']}, {results['elapsed_s']:.1f}s\n"
+        )
+        self.stdout.write(
+            format_table(
+                rows,
+                [
+                    "url",
+                    "requests",
+                    "errors",
+                    "requests_per_s",
+                    "p50_ms",
+                    "p95_ms",
+                    "p99_ms",
+                ],
+            )
+        )
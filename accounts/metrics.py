@@ -0,0 +1,426 @@
+"""
+Per-view request metrics in the Prometheus text format.
+
+Every thread records into its own store, so recording takes no lock. A
+background thread of each worker process writes the sum of its stores to
+``METRICS_DIR`` every ``METRICS_FLUSH_INTERVAL`` seconds, and ``render()``
+adds up the files of all workers sharing the directory, this process's live
+totals included.
+
+The counters of a worker that has exited are merged into ``archive.json``,
+as prometheus_client's multiprocess mode does, so the summed series never go
+down and Prometheus sees no counter reset. Its gauges are dropped, as are
+those of workers that have not flushed for ``STALE_FLUSHES`` intervals.
+"""
+
+import contextvars
+import fcntl
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.urls import Resolver404, resolve
+
+from accounts.audit_log import sink_stats
+from accounts.db import pool_stats
+from accounts.hashing import hashing_stats
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STALE_FLUSHES = 3
+ARCHIVE = "archive.json"
+
+_local = threading.local()
+_stores = []
+_request = contextvars.ContextVar("request_metrics", default=None)
+_flusher_pid = None
+_flusher_lock = threading.Lock()
+
+
+class RequestStats:
+    """Database work of the current request, filled in by record_query()"""
+
+    __slots__ = ("request", "queries", "db_seconds", "_view")
+
+    def __init__(self, request):
+        self.request = request
+        self.queries = 0
+        self.db_seconds = 0.0
+        self._view = None
+
+
+def _store():
+    store = getattr(_local, "store", None)
+    if store is None:
+        store = _local.store = {
+            "requests": defaultdict(int),
+            "duration_buckets": defaultdict(int),
+            "duration_sum": defaultdict(float),
+            "response_bytes": defaultdict(int),
+            "db_queries": defaultdict(int),
+            "db_seconds": defaultdict(float),
+            "slow_queries": defaultdict(int),
+        }
+        # list.append() is atomic, so registering needs no lock either
+        _stores.append(store)
+    return store
+
+
+def start_request(request):
+    """Starts counting the database work of ``request`` in this context"""
+    stats = RequestStats(request)
+    return stats, _request.set(stats)
+
+
+def finish_request(token):
+    _request.reset(token)
+
+
+def current_view():
+    """
+    URL name of the request served in this context. Middleware runs before
+    Django resolves the URL, so the path is resolved here when needed.
+    """
+    stats = _request.get()
+    if stats is None:
+        return None
+    if stats._view is None:
+        match = stats.request.resolver_match
+        if match is None:
+            try:
+                match = resolve(stats.request.path_info)
+            except Resolver404:
+                match = None
+        stats._view = match.view_name if match else "<unresolved>"
+    return stats._view
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute_wrapper adding each query to the current request"""
+    stats = _request.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - started
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """connection_created receiver; wrappers survive reconnects, so add once"""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def record_request(view, method, status, seconds, response_bytes, stats):
+    store = _store()
+    store["requests"][(view, method, str(status))] += 1
+    for bound in DURATION_BUCKETS:
+        if seconds <= bound:
+            store["duration_buckets"][(view, str(bound))] += 1
+            break
+    else:
+        store["duration_buckets"][(view, "+Inf")] += 1
+    store["duration_sum"][(view,)] += seconds
+    if response_bytes is not None:
+        store["response_bytes"][(view,)] += response_bytes
+    store["db_queries"][(view,)] += stats.queries
+    store["db_seconds"][(view,)] += stats.db_seconds
+    _start_flusher()
+
+
+def record_slow_query(view):
+    _store()["slow_queries"][(view,)] += 1
+
+
+def snapshot():
+    """This process's totals as ``{metric: {label tuple: value}}``"""
+    totals = defaultdict(lambda: defaultdict(float))
+    for store in list(_stores):
+        for metric, values in store.items():
+            # dict.copy() is atomic, unlike iterating a dict another thread
+            # may be adding to
+            for labels, value in values.copy().items():
+                totals[metric][labels] += value
+    return totals
+
+
+def _process_gauges():
+    """Audit log, password hashing and connection pool figures of this process"""
+    gauges = defaultdict(lambda: defaultdict(float))
+    for sink in sink_stats():
+        gauges["audit_log_queue_depth"][()] += sink["queue_depth"]
+        gauges["audit_log_written_total"][()] += sink["written"]
+        gauges["audit_log_dropped_total"][()] += sink["dropped"]
+    for operation, stats in hashing_stats().items():
+        gauges["password_hashing_total"][(operation,)] += stats["count"]
+        gauges["password_hashing_seconds_total"][(operation,)] += (
+            stats["total_ms"] / 1000
+        )
+    for name, value in (pool_stats() or {}).items():
+        gauges["db_pool"][(name,)] += value
+    return gauges
+
+
+def _process_totals():
+    return {**snapshot(), **_process_gauges()}
+
+
+def _path(pid):
+    return os.path.join(settings.METRICS_DIR, f"{pid}.json")
+
+
+def _start_flusher():
+    """Starts this process's flush thread; workers forked later start their own"""
+    global _flusher_pid
+    if _flusher_pid == os.getpid():
+        return
+    with _flusher_lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+        threading.Thread(
+            target=_flush_forever, name="metrics-flush", daemon=True
+        ).start()
+
+
+def _flush_forever():
+    while True:
+        time.sleep(settings.METRICS_FLUSH_INTERVAL)
+        try:
+            flush()
+        except OSError:
+            pass
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def flush():
+    """Writes this process's totals for the other workers to read"""
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    data = _serialize(_process_totals())
+    path = _path(os.getpid())
+    temporary = f"{path}.{threading.get_ident()}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(data, f)
+    os.replace(temporary, path)
+
+
+def collect():
+    """Totals of every worker sharing METRICS_DIR, this one read live"""
+    totals = defaultdict(lambda: defaultdict(float))
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    own = os.path.basename(_path(os.getpid()))
+    stale_before = time.time() - STALE_FLUSHES * settings.METRICS_FLUSH_INTERVAL
+    # Workers scraped at the same time must not archive a file twice
+    with open(os.path.join(settings.METRICS_DIR, "archive.lock"), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        archive_path = os.path.join(settings.METRICS_DIR, ARCHIVE)
+        archive = defaultdict(lambda: defaultdict(float))
+        _merge(archive, _read(archive_path) or {})
+        exited = []
+        for name in os.listdir(settings.METRICS_DIR):
+            pid = name.removesuffix(".json")
+            if not name.endswith(".json") or name == own or not pid.isdigit():
+                continue
+            path = os.path.join(settings.METRICS_DIR, name)
+            data = _read(path)
+            if data is None:
+                continue
+            if not _alive(int(pid)):
+                _merge(archive, data, gauges=False)
+                exited.append(path)
+                continue
+            try:
+                stale = os.path.getmtime(path) < stale_before
+            except OSError:
+                continue
+            # A worker that stopped flushing, e.g. because it hangs, still
+            # counted what it flushed; only its gauges are out of date
+            _merge(totals, data, gauges=not stale)
+        if exited:
+            temporary = f"{archive_path}.{os.getpid()}.tmp"
+            with open(temporary, "w") as f:
+                json.dump(_serialize(archive), f)
+            os.replace(temporary, archive_path)
+            for path in exited:
+                os.remove(path)
+    _merge(totals, _serialize(archive))
+    for metric, values in _process_totals().items():
+        for labels, value in values.items():
+            totals[metric][labels] += value
+    return totals
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _serialize(totals):
+    return {
+        metric: [[list(labels), value] for labels, value in values.items()]
+        for metric, values in totals.items()
+    }
+
+
+def _merge(totals, data, gauges=True):
+    """Adds the flushed ``data`` to ``totals``, without gauges if told so"""
+    for metric, values in data.items():
+        if not gauges and metric in GAUGES:
+            continue
+        for labels, value in values:
+            totals[metric][tuple(labels)] += value
+
+
+METRICS = [
+    # name, type, help, label names, source metric
+    (
+        "http_requests_total",
+        "counter",
+        "Requests by view, method and status.",
+        ("view", "method", "status"),
+        "requests",
+    ),
+    (
+        "http_response_bytes_total",
+        "counter",
+        "Response body bytes by view; streamed responses are not counted.",
+        ("view",),
+        "response_bytes",
+    ),
+    (
+        "db_queries_total",
+        "counter",
+        "Database queries by view.",
+        ("view",),
+        "db_queries",
+    ),
+    (
+        "db_query_seconds_total",
+        "counter",
+        "Time spent in database queries by view.",
+        ("view",),
+        "db_seconds",
+    ),
+    (
+        "slow_queries_total",
+        "counter",
+        "Queries slower than SLOW_QUERY_MS by view.",
+        ("view",),
+        "slow_queries",
+    ),
+    (
+        "audit_log_queue_depth",
+        "gauge",
+        "Audit log events waiting to be written.",
+        (),
+        "audit_log_queue_depth",
+    ),
+    (
+        "audit_log_written_total",
+        "counter",
+        "Audit log events written.",
+        (),
+        "audit_log_written_total",
+    ),
+    (
+        "audit_log_dropped_total",
+        "counter",
+        "Audit log events dropped because the queue was full.",
+        (),
+        "audit_log_dropped_total",
+    ),
+    (
+        "password_hashing_total",
+        "counter",
+        "Password hashes computed, by operation.",
+        ("operation",),
+        "password_hashing_total",
+    ),
+    (
+        "password_hashing_seconds_total",
+        "counter",
+        "Time spent hashing passwords, queue wait included, by operation.",
+        ("operation",),
+        "password_hashing_seconds_total",
+    ),
+    (
+        "db_pool",
+        "gauge",
+        "psycopg connection pool statistics, summed over workers.",
+        ("stat",),
+        "db_pool",
+    ),
+]
+
+
+GAUGES = {source for _, kind, _, _, source in METRICS if kind == "gauge"}
+
+
+def render():
+    """Returns the merged metrics in the Prometheus text exposition format"""
+    totals = collect()
+    lines = [
+        "# HELP accounts_http_request_duration_seconds Request latency by view.",
+        "# TYPE accounts_http_request_duration_seconds histogram",
+    ]
+    buckets = totals["duration_buckets"]
+    for (view,), total in sorted(totals["duration_sum"].items()):
+        cumulative = 0
+        for bound in [*map(str, DURATION_BUCKETS), "+Inf"]:
+            cumulative += buckets.get((view, bound), 0)
+            labels = _labels(("view", "le"), (view, bound))
+            lines.append(
+                f"accounts_http_request_duration_seconds_bucket{labels} "
+                f"{_number(cumulative)}"
+            )
+        labels = _labels(("view",), (view,))
+        lines.append(
+            f"accounts_http_request_duration_seconds_sum{labels} {_number(total)}"
+        )
+        lines.append(
+            f"accounts_http_request_duration_seconds_count{labels} "
+            f"{_number(cumulative)}"
+        )
+
+    for name, kind, description, label_names, source in METRICS:
+        lines.append(f"# HELP accounts_{name} {description}")
+        lines.append(f"# TYPE accounts_{name} {kind}")
+        for labels, value in sorted(totals[source].items()):
+            lines.append(
+                f"accounts_{name}{_labels(label_names, labels)} {_number(value)}"
+            )
+    return "\n".join(lines) + "\n"
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
@@ -0,0 +1,294 @@
+import sys
+import time
+from functools import partial
+
+import structlog
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY,
+    HASH_SESSION_KEY,
+    SESSION_KEY,
+    get_user_model,
+    load_backend,
+)
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+from accounts import cache as account_cache
+from accounts import metrics
+from accounts.models import Account
+from accounts.profiling import ProfilerBusy, RequestProfile
+
+logger = structlog.get_logger(__name__)
+
+
+def _verify_session_hash(request, user):
+    """Same session hash check as django.contrib.auth.get_user()"""
+    session_hash = request.session.get(HASH_SESSION_KEY)
+    session_auth_hash = user.get_session_auth_hash()
+    if session_hash and constant_time_compare(session_hash, session_auth_hash):
+        return True
+    if session_hash and any(
+        constant_time_compare(session_hash, fallback_auth_hash)
+        for fallback_auth_hash in user.get_session_auth_fallback_hash()
+    ):
+        request.session.cycle_key()
+        request.session[HASH_SESSION_KEY] = session_auth_hash
+        return True
+    request.session.flush()
+    return False
+
+
+def _load_user_and_account(request):
+    """
+    Loads the session's user together with their newest account, and the
+    account's reviewer, in one query or from the account cache. Returns
+    ``(user, account)``.
+    """
+    try:
+        user_id = get_user_model()._meta.pk.to_python(request.session[SESSION_KEY])
+        backend_path = request.session[BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser(), None
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return AnonymousUser(), None
+
+    backend = load_backend(backend_path)
+    if not isinstance(backend, ModelBackend):
+        user = auth.get_user(request)
+        return user, _load_account(user)
+
+    account = _load_account_for_user(user_id)
+    if account is not None:
+        user = account.user if backend.user_can_authenticate(account.user) else None
+    else:
+        # Staff without an account, or a user who has not registered one yet
+        user = backend.get_user(user_id)
+
+    if user is None or not _verify_session_hash(request, user):
+        return AnonymousUser(), None
+    return user, account
+
+
+def _query_account(user_id):
+    return (
+        Account.objects.select_related("user", "reviewed_by")
+        .filter(user_id=user_id)
+        .first()
+    )
+
+
+def _load_account_for_user(user_id):
+    """Returns the user's account from the shared cache, else from the database"""
+    account_id = account_cache.cached_account_id(user_id)
+    if account_id is None:
+        account = _query_account(user_id)
+        if account is not None:
+            account_cache.remember_account_id(account)
+        return account
+
+    # Read the version first so a concurrent change retires what we store
+    version = account_cache.current_version(account_id)
+    account = account_cache.get_account_snapshot(account_id, version)
+    if account is None:
+        account = _query_account(user_id)
+        if account is not None and account.pk == account_id:
+            account_cache.set_account_snapshot(account, version)
+        elif account is not None:
+            account_cache.remember_account_id(account)
+    return account
+
+
+def _load_account(user):
+    if not user.is_authenticated:
+        return None
+    return Account.objects.select_related("reviewed_by").filter(user=user).first()
+
+
+def get_user(request):
+    if not hasattr(request, "_cached_user"):
+        request._cached_user, request._cached_account = _load_user_and_account(request)
+    return request._cached_user
+
+
+def get_account(request):
+    """Returns the request user's Account, or None"""
+    if not hasattr(request, "_cached_account"):
+        get_user(request)
+    return request._cached_account
+
+
+async def auser(request):
+    # One thread hop for the whole session, cache and ORM lookup instead of one
+    # per step; later calls are served from the request
+    if not hasattr(request, "_cached_user"):
+        await sync_to_async(get_user)(request)
+    return request._cached_user
+
+
+async def aaccount(request):
+    """See get_account()."""
+    await auser(request)
+    return request._cached_account
+
+
+class AccountMiddleware(AuthenticationMiddleware):
+    """
+    Drop-in replacement for AuthenticationMiddleware that also exposes the
+    user's Account as ``request.account`` (``await request.aaccount()`` in
+    async views). Both are loaded lazily by a single joined query.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_user(request))
+        request.auser = partial(auser, request)
+        request.account = SimpleLazyObject(lambda: get_account(request))
+        request.aaccount = partial(aaccount, request)
+
+
+class RequestMetricsMiddleware:
+    """
+    Records each request's latency, database queries and time, response size
+    and status per URL name in accounts.metrics. Goes first in MIDDLEWARE so
+    the other middleware is timed too.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        stats, token = metrics.start_request(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.finish_request(token)
+        self._record(request, response, started, stats)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        # Queries made in sync_to_async() threads see the same context
+        stats, token = metrics.start_request(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.finish_request(token)
+        self._record(request, response, started, stats)
+        return response
+
+    def _record(self, request, response, started, stats):
+        match = request.resolver_match
+        metrics.record_request(
+            view=match.view_name if match else "<unresolved>",
+            method=request.method,
+            status=response.status_code,
+            seconds=time.perf_counter() - started,
+            response_bytes=None if response.streaming else len(response.content),
+            stats=stats,
+        )
+
+
+PROFILE_HEADER = "HTTP_X_PROFILE"
+PROFILE_PARAMETER = "_profile"
+
+
+def _profile_requested(request):
+    """
+    Whether the request asks to be profiled by an ``X-Profile`` header or a
+    ``_profile`` query parameter. The parameter is removed from request.GET
+    so views and admin filters do not see it.
+    """
+    if request.META.get(PROFILE_HEADER):
+        requested = True
+    elif PROFILE_PARAMETER in request.META.get("QUERY_STRING", ""):
+        requested = PROFILE_PARAMETER in request.GET
+        if requested:
+            request.GET = request.GET.copy()
+            del request.GET[PROFILE_PARAMETER]
+    else:
+        return False
+    return requested and request.path.startswith(
+        (reverse("home"), reverse("admin:index"))
+    )
+
+
+class RequestProfilerMiddleware:
+    """
+    Profiles a staff user's request to the accounts views or the admin when
+    it asks for it (see _profile_requested()), saves the profile with
+    accounts.profiling and returns its id in the ``X-Profile-Id`` header.
+    Other requests only pay for looking for the trigger.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not _profile_requested(request) or not request.user.is_staff:
+            return self.get_response(request)
+        try:
+            with RequestProfile() as profile:
+                profile.start(root=sys._getframe())
+                try:
+                    response = self.get_response(request)
+                finally:
+                    profile.stop()
+                profile.save(request, response)
+        except ProfilerBusy as e:
+            return self._skipped(self.get_response(request), e)
+        return self._finish(request, response, profile)
+
+    async def __acall__(self, request):
+        if not _profile_requested(request) or not (await request.auser()).is_staff:
+            return await self.get_response(request)
+        try:
+            with RequestProfile() as profile:
+                # The coroutines run in the event loop thread, sync_to_async()
+                # work in the request's own thread; both are profiled
+                profile.start(root=sys._getframe(), label="event loop")
+                await sync_to_async(profile.start)(label="sync_to_async")
+                try:
+                    response = await self.get_response(request)
+                finally:
+                    await sync_to_async(profile.stop)()
+                    profile.stop()
+                await sync_to_async(profile.save)(request, response)
+        except ProfilerBusy as e:
+            return self._skipped(await self.get_response(request), e)
+        return self._finish(request, response, profile)
+
+    def _finish(self, request, response, profile):
+        response["X-Profile-Id"] = profile.id
+        logger.info(
+            "request_profiled",
+            profile_id=profile.id,
+            path=request.path,
+            status=response.status_code,
+        )
+        return response
+
+    def _skipped(self, response, error):
+        response["X-Profile-Skipped"] = str(error)
+        return response
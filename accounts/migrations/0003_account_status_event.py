@@ -0,0 +1,98 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_alter_account_reviewed_at"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AccountStatusEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "previous_status",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("pending", "Pending"),
+                            ("approved", "Approved"),
+                            ("rejected", "Rejected"),
+                            (
+                                "additional_docs_required",
+                                "Additional Documents Required",
+                            ),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                (
+                    "new_status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("approved", "Approved"),
+                            ("rejected", "Rejected"),
+                            (
+                                "additional_docs_required",
+                                "Additional Documents Required",
+                            ),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                ("change_method", models.CharField(max_length=20)),
+                ("reason", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "account",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="status_events",
+                        to="accounts.account",
+                    ),
+                ),
+                (
+                    "reviewer",
+                    models.ForeignKey(
+                        blank=True,
+                        db_index=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="account_status_events",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["account", "-created_at"],
+                        include=("previous_status", "new_status", "reviewer"),
+                        name="account_event_history_idx",
+                    ),
+                    models.Index(
+                        fields=["reviewer", "-created_at"],
+                        include=("account", "previous_status", "new_status"),
+                        name="account_event_reviewer_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
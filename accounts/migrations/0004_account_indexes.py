@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0003_account_status_event"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="account",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="account_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="account",
+            index=models.Index(
+                fields=["status", "-created_at", "-id"],
+                name="account_status_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="account",
+            index=models.Index(
+                condition=models.Q(
+                    ("status__in", ["pending", "additional_docs_required"])
+                ),
+                fields=["-created_at", "-id"],
+                name="account_review_queue_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="account",
+            index=models.Index(
+                fields=["reviewed_by", "-created_at", "-id"],
+                name="account_reviewer_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="account",
+            index=models.Index(fields=["updated_at"], name="account_updated_idx"),
+        ),
+        migrations.AlterField(
+            model_name="account",
+            name="reviewed_by",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="reviewed_accounts",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
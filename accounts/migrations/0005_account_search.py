@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:56
+
+from django.conf import settings
+from django.db import migrations
+
+# Expressions match Django's icontains/iexact SQL on PostgreSQL, so the
+# planner can use them for admin searches
+USER_SEARCH_INDEXES = {
+    "auth_user_username_trgm_idx": "USING gin (UPPER({username}::text) gin_trgm_ops)",
+    "auth_user_email_trgm_idx": "USING gin (UPPER({email}::text) gin_trgm_ops)",
+    "auth_user_email_upper_idx": "(UPPER({email}::text))",
+}
+
+
+def create_user_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    qn = schema_editor.quote_name
+    columns = {
+        name: qn(User._meta.get_field(name).column) for name in ("username", "email")
+    }
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, definition in USER_SEARCH_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {qn(name)} "
+            f"ON {qn(User._meta.db_table)} {definition.format(**columns)}"
+        )
+
+
+def drop_user_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in USER_SEARCH_INDEXES:
+        schema_editor.execute(
+            f"DROP INDEX IF EXISTS {schema_editor.quote_name(name)}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0004_account_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(create_user_search_indexes, drop_user_search_indexes),
+    ]
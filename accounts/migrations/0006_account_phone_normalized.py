@@ -0,0 +1,92 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:59
+
+import logging
+
+from django.db import migrations, models
+
+import accounts.phone
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_CHUNK_SIZE = 2000
+
+
+def backfill_phone_normalized(apps, schema_editor):
+    """
+    Normalizes existing phone numbers in primary key order. The oldest account
+    keeps a number shared by several accounts; later duplicates, and numbers
+    that do not validate, are left empty and listed for manual review.
+    """
+    Account = apps.get_model("accounts", "Account")
+    queryset = Account.objects.using(schema_editor.connection.alias)
+    skipped = []
+    last_pk = 0
+    while True:
+        chunk = list(
+            queryset.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .only("pk", "phone_number")[:BACKFILL_CHUNK_SIZE]
+        )
+        if not chunk:
+            break
+        last_pk = chunk[-1].pk
+
+        for account in chunk:
+            account.phone_normalized = accounts.phone.normalize_phone(
+                account.phone_number
+            )
+        # Numbers already claimed by an earlier chunk, found with one probe
+        claimed = set(
+            queryset.filter(
+                phone_normalized__in=[a.phone_normalized for a in chunk]
+            ).values_list("phone_normalized", flat=True)
+        )
+        updated = []
+        for account in chunk:
+            if account.phone_normalized is None or account.phone_normalized in claimed:
+                skipped.append(account.pk)
+                continue
+            claimed.add(account.phone_normalized)
+            updated.append(account)
+        queryset.bulk_update(updated, ["phone_normalized"])
+
+    if skipped:
+        logger.warning(
+            "%d accounts have a duplicate or invalid phone number and no "
+            "phone_normalized value: %s%s",
+            len(skipped),
+            ", ".join(map(str, skipped[:50])),
+            " ..." if len(skipped) > 50 else "",
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0005_account_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="account",
+            name="phone_normalized",
+            field=models.CharField(
+                blank=True, editable=False, max_length=16, null=True
+            ),
+        ),
+        migrations.RunPython(backfill_phone_normalized, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="account",
+            name="phone_normalized",
+            field=models.CharField(
+                blank=True, editable=False, max_length=16, null=True, unique=True
+            ),
+        ),
+        migrations.AlterField(
+            model_name="account",
+            name="phone_number",
+            field=models.CharField(
+                max_length=20, validators=[accounts.phone.validate_phone_number]
+            ),
+        ),
+    ]
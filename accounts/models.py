@@ -1,10 +1,176 @@
+import re
+
 import structlog
+from asgiref.sync import sync_to_async
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import IntegrityError, connections, models, router, transaction
+from django.utils import timezone
+
+from accounts.cache import bump_account_versions, note_reviewer
+from accounts.phone import normalize_phone, validate_phone_number
 
 logger = structlog.get_logger(__name__)
 
+REVIEW_REASON_FIELDS = {
+    "rejected": "rejection_reason",
+    "additional_docs_required": "additional_docs_reason",
+}
+
+REVIEW_REASON_ERRORS = {
+    "rejection_reason": "Rejection reason is required when status is rejected",
+    "additional_docs_reason": "Additional documents reason is required when status is additional documents required.",
+}
+
+# Unique columns whose duplicates are reported against the field users edit
+UNIQUE_ERROR_FIELDS = {"phone_normalized": "phone_number"}
+
+_EMAIL_SEARCH_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+# Shorter digit runs, such as the "42" of "trader42", are searched in
+# usernames and emails instead of phone numbers
+PHONE_SEARCH_MIN_DIGITS = 6
+
+
+class AccountQuerySet(models.QuerySet):
+    def search(self, term):
+        """
+        Finds accounts through an index: phone-like terms with at least
+        PHONE_SEARCH_MIN_DIGITS digits match the start of the normalized phone
+        number, complete email addresses match exactly, and anything else
+        matches part of the username or email (trigram indexes on PostgreSQL).
+        """
+        term = term.strip()
+        if not term:
+            return self
+        phone = normalize_phone(term)
+        if phone and sum(c.isdigit() for c in term) >= PHONE_SEARCH_MIN_DIGITS:
+            # A national number, or digits that start with the country code
+            prefixes = {phone, normalize_phone("+" + term.lstrip("+"))} - {None}
+            query = models.Q()
+            for prefix in prefixes:
+                query |= models.Q(phone_normalized__startswith=prefix)
+            return self.filter(query)
+        if _EMAIL_SEARCH_RE.match(term):
+            return self.filter(user__email__iexact=term)
+        # A subquery lets both auth_user indexes combine before the join
+        users = User.objects.filter(
+            models.Q(username__icontains=term) | models.Q(email__icontains=term)
+        )
+        return self.filter(user__in=users.values("pk"))
+
+    def bulk_review(self, status, reviewer, reason=None, chunk_size=1000):
+        """
+        Moves every account in the queryset to ``status`` with chunked UPDATEs
+        instead of per-row saves, and writes one audit record per changed row.
+        Returns the number of accounts whose status changed.
+        """
+        reason_field = REVIEW_REASON_FIELDS.get(status)
+        if reason_field and not reason:
+            raise ValidationError({reason_field: REVIEW_REASON_ERRORS[reason_field]})
+
+        now = timezone.now()
+        values = {
+            "status": status,
+            "approved_at": now if status == "approved" else None,
+            "reviewed_by": reviewer,
+            "reviewed_at": now,
+            "updated_at": now,
+        }
+        if reason_field:
+            values[reason_field] = reason
+
+        ids = list(self.exclude(status=status).order_by().values_list("pk", flat=True))
+        updated = 0
+        for start in range(0, len(ids), chunk_size):
+            with transaction.atomic(using=self.db):
+                rows = self._review_chunk(ids[start : start + chunk_size], values)
+                AccountStatusEvent.objects.using(self.db).bulk_create(
+                    AccountStatusEvent(
+                        account_id=account_id,
+                        reviewer=reviewer,
+                        previous_status=previous_status,
+                        new_status=status,
+                        change_method="bulk_review",
+                        reason=reason if reason_field else "",
+                    )
+                    for account_id, _, previous_status in rows
+                )
+                bump_account_versions([row[0] for row in rows], using=self.db)
+                if rows:
+                    note_reviewer(reviewer.pk, using=self.db)
+            updated += len(rows)
+
+            for account_id, user_id, previous_status in rows:
+                logger.info(
+                    "account_status_changed",
+                    user_id=user_id,
+                    account_id=account_id,
+                    previous_status=previous_status,
+                    new_status=status,
+                    reviewer_id=reviewer.id,
+                    reviewer_username=reviewer.username,
+                    reviewer_email=reviewer.email,
+                    reviewed_at=now.isoformat(),
+                    approved_at=values["approved_at"].isoformat()
+                    if values["approved_at"]
+                    else None,
+                    rejection_reason=values.get("rejection_reason"),
+                    additional_docs_reason=values.get("additional_docs_reason"),
+                    event_type="status_change",
+                    change_method="bulk_review",
+                )
+        return updated
+
+    def _review_chunk(self, ids, values):
+        """
+        Applies ``values`` to the accounts in ``ids`` that are not already in
+        the target status. Returns ``(id, user_id, previous_status)`` rows.
+        """
+        connection = connections[self.db]
+        if connection.vendor == "postgresql":
+            return self._review_chunk_returning(connection, ids, values)
+
+        rows = list(
+            self.model._default_manager.using(self.db)
+            .select_for_update()
+            .filter(pk__in=ids)
+            .exclude(status=values["status"])
+            .order_by()
+            .values_list("pk", "user_id", "status")
+        )
+        self.model._default_manager.using(self.db).filter(
+            pk__in=[row[0] for row in rows]
+        ).update(**values)
+        return rows
+
+    def _review_chunk_returning(self, connection, ids, values):
+        qn = connection.ops.quote_name
+        opts = self.model._meta
+        table = qn(opts.db_table)
+        pk = qn(opts.pk.column)
+        status = qn(opts.get_field("status").column)
+        user = qn(opts.get_field("user").column)
+
+        assignments = []
+        params = []
+        for name, value in values.items():
+            field = opts.get_field(name)
+            if field.is_relation:
+                value = value.pk if value is not None else None
+            assignments.append(f"{qn(field.column)} = %s")
+            params.append(field.get_db_prep_save(value, connection))
+
+        sql = (
+            f"UPDATE {table} AS acct SET {', '.join(assignments)} "
+            f"FROM (SELECT {pk}, {status} FROM {table} "
+            f"WHERE {pk} = ANY(%s) AND {status} <> %s FOR UPDATE) AS prev "
+            f"WHERE acct.{pk} = prev.{pk} "
+            f"RETURNING acct.{pk}, acct.{user}, prev.{status}"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [*params, list(ids), values["status"]])
+            return cursor.fetchall()
+
 
 class Account(models.Model):
     STATUS_CHOICES = [
@@ -15,7 +181,12 @@ class Account(models.Model):
     ]
 
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="accounts")
-    phone_number = models.CharField(max_length=20, unique=True)
+    phone_number = models.CharField(max_length=20, validators=[validate_phone_number])
+    # E.164 form of phone_number, set by save(). Enforces uniqueness and serves
+    # phone number searches. Empty for legacy duplicates until they are edited.
+    phone_normalized = models.CharField(
+        max_length=16, unique=True, null=True, blank=True, editable=False
+    )
     address = models.TextField()
     status = models.CharField(max_length=30, choices=STATUS_CHOICES, default="pending")
     created_at = models.DateTimeField(auto_now_add=True)
@@ -31,11 +202,33 @@ class Account(models.Model):
         related_name="reviewed_accounts",
         null=True,
         blank=True,
+        db_index=False,
     )
     reviewed_at = models.DateTimeField(blank=True, null=True)
 
+    objects = AccountQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
+        # The admin changelist appends -pk to the default ordering, so the
+        # ordering indexes end with id to serve the ORDER BY without a sort
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="account_created_idx"),
+            models.Index(
+                fields=["status", "-created_at", "-id"],
+                name="account_status_created_idx",
+            ),
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=models.Q(status__in=["pending", "additional_docs_required"]),
+                name="account_review_queue_idx",
+            ),
+            models.Index(
+                fields=["reviewed_by", "-created_at", "-id"],
+                name="account_reviewer_created_idx",
+            ),
+            models.Index(fields=["updated_at"], name="account_updated_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.get_status_display()}"
@@ -43,9 +236,7 @@ class Account(models.Model):
     def clean(self):
         if self.status == "rejected" and not self.rejection_reason:
             raise ValidationError(
-                {
-                    "rejection_reason": "Rejection reason is required when status is rejected"
-                }
+                {"rejection_reason": REVIEW_REASON_ERRORS["rejection_reason"]}
             )
         if (
             self.status == "additional_docs_required"
@@ -53,33 +244,173 @@ class Account(models.Model):
         ):
             raise ValidationError(
                 {
-                    "additional_docs_reason": "Additional documents reason is required when status is additional documents required."
+                    "additional_docs_reason": REVIEW_REASON_ERRORS[
+                        "additional_docs_reason"
+                    ]
                 }
             )
 
-    def save(self, *args, **kwargs):
-        self.full_clean()
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_loaded_values()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        self._snapshot_loaded_values()
+
+    def _snapshot_loaded_values(self):
+        """Remember the field values as they were loaded from the database"""
+        deferred = self.get_deferred_fields()
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+            if field.attname not in deferred
+        }
 
-        # Get the original object from database to compare changes
-        original_obj = None
-        is_new = self.pk is None
+    def _changed_fields(self):
+        """Returns the attnames whose values differ from the loaded snapshot"""
+        loaded_values = getattr(self, "_loaded_values", {})
+        return {
+            field.attname
+            for field in self._meta.concrete_fields
+            if field.attname in loaded_values
+            and getattr(self, field.attname) != loaded_values[field.attname]
+        }
 
-        if not is_new:
+    def _cached_related(self, name):
+        """Returns the related object for ``name`` only if it is already loaded"""
+        return self._meta.get_field(name).get_cached_value(self, default=None)
+
+    def unique_error_message(self, model_class, unique_check):
+        if len(unique_check) == 1 and unique_check[0] in UNIQUE_ERROR_FIELDS:
+            unique_check = (UNIQUE_ERROR_FIELDS[unique_check[0]],)
+        return super().unique_error_message(model_class, unique_check)
+
+    def validate_unique(self, exclude=None):
+        try:
+            super().validate_unique(exclude=exclude)
+        except ValidationError as e:
+            errors = e.update_error_dict({})
+            for field, reported in UNIQUE_ERROR_FIELDS.items():
+                if field in errors:
+                    errors.setdefault(reported, []).extend(errors.pop(field))
+            raise ValidationError(errors)
+
+    def _unique_violation(self, error):
+        """
+        Returns the ValidationError matching an IntegrityError raised by a
+        unique column, or None if ``error`` is about something else.
+        """
+        message = str(error)
+        for field in self._meta.concrete_fields:
+            if field.unique and not field.primary_key and field.column in message:
+                return ValidationError(
+                    {
+                        UNIQUE_ERROR_FIELDS.get(field.name, field.name): (
+                            self.unique_error_message(Account, (field.name,))
+                        )
+                    }
+                )
+        return None
+
+    def _previous_status(self):
+        if "status" in getattr(self, "_loaded_values", {}):
+            return self._loaded_values["status"]
+        # Instance was not loaded from the database (or status was deferred)
+        return (
+            Account.objects.filter(pk=self.pk).values_list("status", flat=True).first()
+        )
+
+    def _review_reason(self):
+        reason_field = REVIEW_REASON_FIELDS.get(self.status)
+        return (getattr(self, reason_field) or "") if reason_field else ""
+
+    def _validate_for_save(self, is_new, validate_unique=True):
+        if is_new:
+            unchanged = set()
+        else:
+            changed = self._changed_fields()
+            unchanged = {
+                field.name
+                for field in self._meta.concrete_fields
+                if field.attname in getattr(self, "_loaded_values", {})
+                and field.attname not in changed
+            }
+
+        # The database enforces foreign keys, so skip the existence query when
+        # the related object is already in memory
+        exclude = unchanged | {
+            field.name
+            for field in self._meta.concrete_fields
+            if field.is_relation and field.is_cached(self)
+        }
+        self.full_clean(exclude=exclude, validate_unique=validate_unique)
+
+    def save(self, *args, validate_unique=True, actor=None, **kwargs):
+        """
+        Validates and saves the account together with its status history.
+        Callers whose form has already checked uniqueness pass
+        ``validate_unique=False`` to skip the repeated SELECTs; a duplicate
+        that slips in concurrently is still raised as a ValidationError on
+        the field, from the database's unique constraint.
+
+        ``actor`` is the user making the change, recorded as the reviewer of
+        a status change; ``reviewed_by`` keeps the first reviewer, so it is
+        only the fallback.
+        """
+        is_new = self._state.adding
+        if is_new or "phone_number" in self._changed_fields():
+            self.phone_normalized = normalize_phone(self.phone_number)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "phone_number" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "phone_normalized"}
+        self._validate_for_save(is_new, validate_unique)
+
+        previous_status = None if is_new else self._previous_status()
+        status_changed = is_new or (
+            previous_status is not None and previous_status != self.status
+        )
+        reviewer = actor or self._cached_related("reviewed_by")
+        reviewer_id = actor.pk if actor else self.reviewed_by_id
+
+        # The history row commits or rolls back together with the account
+        using = kwargs.get("using") or router.db_for_write(Account, instance=self)
+        with transaction.atomic(using=using, savepoint=False):
             try:
-                original_obj = Account.objects.get(pk=self.pk)
-            except Account.DoesNotExist:
-                pass
+                super().save(*args, **kwargs)
+            except IntegrityError as e:
+                if (error := self._unique_violation(e)) is None:
+                    raise
+                raise error from e
+            if status_changed:
+                AccountStatusEvent.objects.using(using).create(
+                    account=self,
+                    reviewer_id=None if is_new else reviewer_id,
+                    previous_status=previous_status or "",
+                    new_status=self.status,
+                    change_method="model_save",
+                    reason=self._review_reason(),
+                )
+            if not is_new:
+                bump_account_versions([self.pk], using=using)
+            if self.reviewed_by_id is not None and (
+                is_new or "reviewed_by_id" in self._changed_fields()
+            ):
+                note_reviewer(self.reviewed_by_id, using=using)
+        self._snapshot_loaded_values()
 
-        super().save(*args, **kwargs)
+        user = self._cached_related("user")
 
         # Log audit record
         if is_new:
             # Log when new account is created
             logger.info(
                 "new_account_created",
-                user_id=self.user.id,
-                username=self.user.username,
-                user_email=self.user.email,
+                user_id=self.user_id,
+                username=user.username if user else None,
+                user_email=user.email if user else None,
                 account_id=self.id,
                 status=self.status,
                 phone_number=self.phone_number,
@@ -88,21 +419,19 @@ class Account(models.Model):
                 event_type="account_creation",
                 change_method="model_save",
             )
-        elif original_obj and original_obj.status != self.status:
+        elif status_changed:
             # Log when account status changes
             logger.info(
                 "account_status_changed",
-                user_id=self.user.id,
-                username=self.user.username,
-                user_email=self.user.email,
+                user_id=self.user_id,
+                username=user.username if user else None,
+                user_email=user.email if user else None,
                 account_id=self.id,
-                previous_status=original_obj.status,
+                previous_status=previous_status,
                 new_status=self.status,
-                reviewer_id=self.reviewed_by.id if self.reviewed_by else None,
-                reviewer_username=self.reviewed_by.username
-                if self.reviewed_by
-                else None,
-                reviewer_email=self.reviewed_by.email if self.reviewed_by else None,
+                reviewer_id=reviewer_id,
+                reviewer_username=reviewer.username if reviewer else None,
+                reviewer_email=reviewer.email if reviewer else None,
                 reviewed_at=self.reviewed_at.isoformat() if self.reviewed_at else None,
                 approved_at=self.approved_at.isoformat() if self.approved_at else None,
                 rejection_reason=self.rejection_reason,
@@ -112,3 +441,76 @@ class Account(models.Model):
                 event_type="status_change",
                 change_method="model_save",
             )
+
+    async def asave(self, *args, validate_unique=True, actor=None, **kwargs):
+        return await sync_to_async(self.save)(
+            *args, validate_unique=validate_unique, actor=actor, **kwargs
+        )
+
+
+class AccountStatusEventQuerySet(models.QuerySet):
+    def for_account(self, account_id):
+        """Status history of one account, newest first"""
+        return self.filter(account_id=account_id).order_by("-created_at")
+
+    def for_reviewer(self, reviewer_id, since=None, until=None):
+        """Status changes made by one reviewer, newest first"""
+        queryset = self.filter(reviewer_id=reviewer_id)
+        if since is not None:
+            queryset = queryset.filter(created_at__gte=since)
+        if until is not None:
+            queryset = queryset.filter(created_at__lt=until)
+        return queryset.order_by("-created_at")
+
+
+class AccountStatusEvent(models.Model):
+    """Append-only history of Account status changes, including creation"""
+
+    account = models.ForeignKey(
+        Account,
+        on_delete=models.CASCADE,
+        related_name="status_events",
+        db_index=False,
+    )
+    reviewer = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        related_name="account_status_events",
+        null=True,
+        blank=True,
+        db_index=False,
+    )
+    previous_status = models.CharField(
+        max_length=30, choices=Account.STATUS_CHOICES, blank=True
+    )
+    new_status = models.CharField(max_length=30, choices=Account.STATUS_CHOICES)
+    change_method = models.CharField(max_length=20)
+    reason = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = AccountStatusEventQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["account", "-created_at"],
+                include=["previous_status", "new_status", "reviewer"],
+                name="account_event_history_idx",
+            ),
+            models.Index(
+                fields=["reviewer", "-created_at"],
+                include=["account", "previous_status", "new_status"],
+                name="account_event_reviewer_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.account_id}: {self.previous_status or '-'} -> {self.new_status}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Account status events are append-only.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Account status events are append-only.")
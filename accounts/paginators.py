@@ -0,0 +1,36 @@
+import json
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that trusts the PostgreSQL planner's row estimate instead of
+    running an exact COUNT(*) when the estimate exceeds ``estimate_threshold``.
+    Smaller results, and other databases, are counted exactly.
+    """
+
+    estimate_threshold = 10000
+
+    @cached_property
+    def count(self):
+        estimate = self.estimated_count()
+        if estimate is not None and estimate > self.estimate_threshold:
+            return estimate
+        return super().count
+
+    def estimated_count(self):
+        """Planner estimate of the number of objects, or None if unavailable"""
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return None
+        if connections[queryset.db].vendor != "postgresql":
+            return None
+        plan = json.loads(queryset.order_by().explain(format="json"))
+        # Django unwraps the single-plan list when the driver decodes JSON
+        if isinstance(plan, list):
+            plan = plan[0]
+        return int(plan["Plan"]["Plan Rows"])
@@ -0,0 +1,47 @@
+"""
+Phone number validation and normalization shared by the forms, the model and
+the bulk import.
+
+Numbers are stored as entered, plus an E.164-style canonical form ("+"
+followed by up to 15 digits) that is unique across accounts. Numbers written
+without a country code are assumed to be national numbers in
+``PHONE_DEFAULT_COUNTRY_CODE``, with the leading trunk "0" dropped, so
+"(02) 1234-5678" and "+886 2 1234 5678" are the same number.
+"""
+
+import re
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+INVALID_PHONE_MESSAGE = "Please enter a valid phone number"
+
+# Digits with optional spacing and punctuation, and an optional leading "+"
+_PHONE_RE = re.compile(r"\+?[0-9\s().-]*[0-9][0-9\s().-]*")
+_NON_DIGITS_RE = re.compile(r"[^0-9]")
+_MAX_DIGITS = 15
+
+
+def normalize_phone(value, country_code=None):
+    """Returns the canonical form of ``value``, or None if it is not valid"""
+    value = (value or "").strip()
+    if not _PHONE_RE.fullmatch(value):
+        return None
+    digits = _NON_DIGITS_RE.sub("", value)
+    if value.startswith("+"):
+        pass
+    elif digits.startswith("00"):
+        # International call prefix
+        digits = digits[2:]
+    else:
+        digits = (country_code or settings.PHONE_DEFAULT_COUNTRY_CODE) + (
+            digits.removeprefix("0")
+        )
+    if not digits or len(digits) > _MAX_DIGITS:
+        return None
+    return f"+{digits}"
+
+
+def validate_phone_number(value):
+    if normalize_phone(value) is None:
+        raise ValidationError(INVALID_PHONE_MESSAGE, code="invalid")
@@ -0,0 +1,173 @@
+"""
+On-demand profiling of single requests.
+
+One request per process is profiled at a time. The threads serving it run
+under cProfile while a sampler thread records their stacks every
+``SAMPLE_INTERVAL`` seconds. A profile is written to ``PROFILER_DIR`` as
+``<id>.txt`` (the top ``PROFILER_TOP_N`` functions by cumulative time),
+``<id>.prof`` (the raw stats, for pstats or snakeviz) and ``<id>.collapsed``
+(one ``frame;frame count`` line per sampled stack, the input of
+flamegraph.pl and speedscope).
+
+Up to Python 3.11 each thread gets a profiler of its own. From 3.12 a single
+profiler sees every thread of the process, the work of other requests
+served meanwhile included. The sampled stacks are limited to the profiled
+request's threads either way.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+
+SAMPLE_INTERVAL = 0.001
+# From 3.12 cProfile is built on sys.monitoring: one profiler sees every
+# thread, and a second one cannot be enabled alongside it
+PROFILER_SEES_ALL_THREADS = sys.version_info >= (3, 12)
+
+_lock = threading.Lock()
+
+
+class ProfilerBusy(Exception):
+    """Another request, or another profiling tool, holds the profiler"""
+
+
+class RequestProfile:
+    """
+    Use as a context manager, which raises ProfilerBusy while another
+    request is being profiled. Call start() and stop() in every thread
+    serving the request, then save() once all of them have stopped.
+    """
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self._profilers = []
+        self._enabled = {}
+        self._sampler = _Sampler()
+
+    def __enter__(self):
+        if not _lock.acquire(blocking=False):
+            raise ProfilerBusy("Another request is being profiled")
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        # Only left enabled when stop() was skipped; on 3.12+ disabling works
+        # from any thread, so the process can be profiled again
+        for profiler in self._enabled.values():
+            profiler.disable()
+        self._sampler.close()
+        _lock.release()
+
+    def start(self, root=None, label=None):
+        """
+        Profiles and samples the calling thread. With ``root``, only stacks
+        running inside that frame are sampled, which keeps out the other
+        requests an event loop thread serves meanwhile; ``label`` prefixes
+        its stacks.
+        """
+        thread_id = threading.get_ident()
+        self._sampler.watch(thread_id, root, label)
+        if self._enabled and PROFILER_SEES_ALL_THREADS:
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # Python 3.12+: some other tool already profiles the process
+            self._sampler.unwatch(thread_id)
+            raise ProfilerBusy(str(e)) from e
+        self._enabled[thread_id] = profiler
+        self._profilers.append(profiler)
+
+    def stop(self):
+        thread_id = threading.get_ident()
+        profiler = self._enabled.pop(thread_id, None)
+        if profiler is not None:
+            profiler.disable()
+        self._sampler.unwatch(thread_id)
+
+    def save(self, request, response):
+        elapsed = time.perf_counter() - self._started
+        self._sampler.join()
+        os.makedirs(settings.PROFILER_DIR, exist_ok=True)
+        path = os.path.join(settings.PROFILER_DIR, self.id)
+
+        report = io.StringIO()
+        report.write(
+            f"{request.method} {request.get_full_path()} -> "
+            f"{response.status_code} in {elapsed * 1000:.1f}ms, "
+            f"{sum(self._sampler.stacks.values())} samples\n\n"
+        )
+        stats = pstats.Stats(*self._profilers, stream=report)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE)
+        stats.print_stats(settings.PROFILER_TOP_N)
+        with open(f"{path}.txt", "w") as f:
+            f.write(report.getvalue())
+        stats.dump_stats(f"{path}.prof")
+        with open(f"{path}.collapsed", "w") as f:
+            f.writelines(
+                f"{stack} {count}\n" for stack, count in self._sampler.stacks.items()
+            )
+
+
+class _Sampler(threading.Thread):
+    """Counts the stacks of the watched threads until none is left"""
+
+    def __init__(self):
+        super().__init__(name="request-profiler", daemon=True)
+        self.stacks = Counter()
+        self._threads = {}
+
+    def watch(self, thread_id, root, label):
+        self._threads[thread_id] = (root, label)
+        if not self.is_alive():
+            self.start()
+
+    def unwatch(self, thread_id):
+        self._threads.pop(thread_id, None)
+
+    def close(self):
+        self._threads.clear()
+        if self.is_alive():
+            self.join()
+
+    def run(self):
+        while self._threads:
+            time.sleep(SAMPLE_INTERVAL)
+            frames = sys._current_frames()
+            for thread_id, (root, label) in list(self._threads.items()):
+                stack = _stack(frames.get(thread_id), root)
+                if stack:
+                    if label:
+                        stack.append(label)
+                    self.stacks[";".join(reversed(stack))] += 1
+
+
+def _stack(frame, root):
+    """Labels of ``frame`` and its callers up to ``root``, innermost first"""
+    stack = []
+    while frame is not None:
+        if frame is root:
+            return stack
+        stack.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    # Without a root the whole stack counts; with one, a stack not passing
+    # through it belongs to some other work of the thread
+    return stack if root is None else []
+
+
+def _frame_label(code):
+    filename = code.co_filename
+    if "site-packages" + os.sep in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[1]
+    elif filename.startswith(str(settings.BASE_DIR)):
+        filename = os.path.relpath(filename, settings.BASE_DIR)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ",")
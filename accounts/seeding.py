@@ -0,0 +1,88 @@
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from accounts.models import Account
+from accounts.phone import normalize_phone
+
+STATUS_WEIGHTS = {
+    "approved": 70,
+    "pending": 15,
+    "rejected": 10,
+    "additional_docs_required": 5,
+}
+
+
+@contextmanager
+def explicit_timestamps():
+    """Lets bulk_create keep the given created_at/updated_at values"""
+    fields = [Account._meta.get_field(name) for name in ("created_at", "updated_at")]
+    flags = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, flags):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def seed_accounts(count, reviewers=(), batch_size=5000, seed=None):
+    """
+    Bulk inserts ``count`` users with one account each, spread over the last
+    two years with a realistic status mix. Reviewed accounts are assigned to
+    one of ``reviewers``. Returns the number of accounts created.
+    """
+    rng = random.Random(seed)
+    token = get_random_string(6).lower()
+    phone_base = rng.randrange(10**9)
+    password = make_password(None)
+    reviewer_ids = [reviewer.pk for reviewer in reviewers]
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+    now = timezone.now()
+
+    for start in range(0, count, batch_size):
+        size = min(batch_size, count - start)
+        users = User.objects.bulk_create(
+            User(
+                username=f"seed_{token}_{start + i}",
+                email=f"seed_{token}_{start + i}@example.com",
+                password=password,
+            )
+            for i in range(size)
+        )
+
+        accounts = []
+        for i, user in enumerate(users):
+            status = rng.choices(statuses, weights)[0]
+            reviewed = status != "pending" and reviewer_ids
+            phone_number = f"+1{(phone_base + start + i) % 10**10:010d}"
+            created_at = now - timedelta(minutes=rng.randrange(2 * 365 * 1440))
+            updated_at = created_at + timedelta(minutes=rng.randrange(30 * 1440))
+            accounts.append(
+                Account(
+                    user=user,
+                    phone_number=phone_number,
+                    phone_normalized=normalize_phone(phone_number),
+                    address=f"{start + i} Seed St",
+                    status=status,
+                    created_at=created_at,
+                    updated_at=updated_at,
+                    rejection_reason="Seeded" if status == "rejected" else None,
+                    additional_docs_reason="Seeded"
+                    if status == "additional_docs_required"
+                    else None,
+                    approved_at=updated_at if status == "approved" else None,
+                    reviewed_by_id=rng.choice(reviewer_ids) if reviewed else None,
+                    reviewed_at=updated_at if reviewed else None,
+                )
+            )
+        with explicit_timestamps():
+            Account.objects.bulk_create(accounts)
+    return count
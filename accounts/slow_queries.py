@@ -0,0 +1,157 @@
+"""
+Opt-in slow query capture, enabled by setting ``SLOW_QUERY_MS``.
+
+An execute_wrapper times every query. A sample of them, and every slow one,
+is kept in a ring buffer. Queries slower than ``SLOW_QUERY_MS`` are logged
+with the view serving them, a fingerprint of the SQL and the call site. On
+PostgreSQL the first slow SELECT of each fingerprint is also EXPLAINed in a
+background thread, so the request does not wait for the plan.
+"""
+
+import hashlib
+import random
+import re
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import structlog
+from django.conf import settings
+from django.db import connections
+
+from accounts import metrics
+
+logger = structlog.get_logger(__name__)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_RE = re.compile(r"%s|\?")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+# Fingerprints already EXPLAINed; bounded so odd SQL cannot grow it forever
+_MAX_EXPLAINED = 10000
+
+_recent = None
+_explained = set()
+_explain_executor = None
+_explain_lock = threading.Lock()
+_local = threading.local()
+
+
+def fingerprint(sql):
+    """Returns ``(fingerprint, normalized_sql)``, with literals and IN lists folded"""
+    normalized = _STRING_RE.sub("?", sql)
+    normalized = _NUMBER_RE.sub("?", normalized)
+    normalized = _PLACEHOLDER_RE.sub("?", normalized)
+    normalized = _IN_LIST_RE.sub("(...)", normalized)
+    normalized = _SPACE_RE.sub(" ", normalized).strip()
+    return hashlib.sha1(normalized.encode()).hexdigest()[:16], normalized
+
+
+def recent_queries():
+    """The sampled and slow queries kept in this process, oldest first"""
+    return list(_recent or ())
+
+
+def install(sender, connection, **kwargs):
+    """connection_created receiver; does nothing unless SLOW_QUERY_MS is set"""
+    if settings.SLOW_QUERY_MS > 0 and record not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record)
+
+
+def record(execute, sql, params, many, context):
+    """Database execute_wrapper timing each query"""
+    if getattr(_local, "explaining", False):
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        slow = elapsed_ms >= settings.SLOW_QUERY_MS
+        if slow or random.random() < settings.SLOW_QUERY_SAMPLE_RATE:
+            _capture(sql, params, many, context, elapsed_ms, slow)
+
+
+def _capture(sql, params, many, context, elapsed_ms, slow):
+    global _recent
+    key, normalized = fingerprint(sql)
+    view = metrics.current_view()
+    entry = {
+        "fingerprint": key,
+        "sql": normalized,
+        "duration_ms": round(elapsed_ms, 3),
+        "view": view,
+        "slow": slow,
+        "at": time.time(),
+    }
+    if _recent is None:
+        _recent = deque(maxlen=settings.SLOW_QUERY_BUFFER_SIZE)
+    _recent.append(entry)
+    if not slow:
+        return
+
+    connection = context["connection"]
+    metrics.record_slow_query(view or "<none>")
+    logger.warning(
+        "slow_query",
+        view=view,
+        fingerprint=key,
+        sql=normalized,
+        duration_ms=entry["duration_ms"],
+        database=connection.alias,
+        stack=_call_site(),
+    )
+    if (
+        settings.SLOW_QUERY_EXPLAIN
+        and connection.vendor == "postgresql"
+        and not many
+        and normalized.upper().startswith("SELECT")
+    ):
+        _explain_later(connection.alias, key, view, sql, params)
+
+
+def _call_site(limit=8):
+    """The innermost project frames that led to the query"""
+    frames = [
+        frame
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(str(settings.BASE_DIR))
+        and "site-packages" not in frame.filename
+        and frame.filename != __file__
+    ]
+    return [
+        f"{frame.filename}:{frame.lineno} in {frame.name}" for frame in frames[-limit:]
+    ]
+
+
+def _explain_later(alias, key, view, sql, params):
+    global _explain_executor
+    with _explain_lock:
+        if key in _explained or len(_explained) >= _MAX_EXPLAINED:
+            return
+        _explained.add(key)
+        if _explain_executor is None:
+            _explain_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="slow-query-explain"
+            )
+    _explain_executor.submit(_explain, alias, key, view, sql, params)
+
+
+def _explain(alias, key, view, sql, params):
+    # Runs on the executor's own connection, never inside the request's
+    # transaction; EXPLAIN without ANALYZE does not execute the query
+    connection = connections[alias]
+    _local.explaining = True
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN {sql}", params)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        logger.info("slow_query_plan", view=view, fingerprint=key, plan=plan)
+    except Exception as e:
+        logger.warning("slow_query_plan_failed", fingerprint=key, error=str(e))
+    finally:
+        _local.explaining = False
+        connection.close()
@@ -4,6 +4,19 @@ from django.contrib.auth.models import User
 from accounts.models import Account
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache(settings, tmp_path):
+    settings.CACHES = {
+        alias: {**config, "LOCATION": str(tmp_path / alias)}
+        for alias, config in settings.CACHES.items()
+    }
+
+
+@pytest.fixture(autouse=True)
+def isolated_metrics(settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path / "metrics")
+
+
 @pytest.fixture
 def user():
     return User.objects.create_user(
@@ -0,0 +1,72 @@
+import json
+import logging
+import threading
+
+import pytest
+import structlog
+
+from accounts.audit_log import QueuedAuditHandler, dumps, sink_stats
+
+
+@pytest.fixture
+def audit_logger():
+    stdlib_logger = logging.getLogger("accounts.tests.audit")
+    stdlib_logger.setLevel(logging.INFO)
+    stdlib_logger.propagate = False
+    yield stdlib_logger
+    stdlib_logger.handlers.clear()
+
+
+def attach_handler(stdlib_logger, path, **kwargs):
+    handler = QueuedAuditHandler(path, **kwargs)
+    handler.setFormatter(
+        structlog.stdlib.ProcessorFormatter(
+            processor=structlog.processors.JSONRenderer(serializer=dumps)
+        )
+    )
+    stdlib_logger.addHandler(handler)
+    return handler
+
+
+def test_audit_handler_writes_each_event_once(tmp_path, audit_logger):
+    handler = attach_handler(audit_logger, tmp_path / "audit.log")
+    logger = structlog.get_logger(audit_logger.name)
+    logger.info("account_status_changed", account_id=1)
+    logger.info("new_account_created", account_id=2)
+    handler.flush()
+
+    lines = (tmp_path / "audit.log").read_text().splitlines()
+    assert [json.loads(line)["event"] for line in lines] == [
+        "account_status_changed",
+        "new_account_created",
+    ]
+    assert handler.stats()["written"] == 2
+    assert handler.stats() in sink_stats()
+
+    handler.close()
+    assert handler.stats() not in sink_stats()
+
+
+def test_audit_handler_drops_events_when_queue_is_full(tmp_path, audit_logger):
+    handler = attach_handler(audit_logger, tmp_path / "audit.log", queue_size=1)
+    release = threading.Event()
+    write = handler._write
+
+    def slow_write(lines):
+        release.wait()
+        write(lines)
+
+    handler._write = slow_write
+    logger = structlog.get_logger(audit_logger.name)
+    for account_id in range(3):
+        logger.info("account_status_changed", account_id=account_id)
+
+    # The writer holds at most one event and the queue one more
+    assert handler.stats()["dropped"] >= 1
+
+    release.set()
+    handler.close()
+    stats = handler.stats()
+    assert stats["written"] + stats["dropped"] == 3
+    lines = (tmp_path / "audit.log").read_text().splitlines()
+    assert len(lines) == stats["written"]
@@ -0,0 +1,101 @@
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from accounts.cache import bump_user_accounts
+from accounts.cache_backends import FileBasedCache
+from accounts.models import Account
+
+
+@pytest.fixture
+def status_client(client, regular_user, account):
+    client.login(username="testuser", password="testpass123")
+    # First hit learns the account id, second one caches the snapshot
+    client.get(reverse("account_status"))
+    client.get(reverse("account_status"))
+    return client
+
+
+@pytest.mark.django_db
+def test_account_status_is_served_from_cache(status_client, django_assert_num_queries):
+    # Only the session lookup reaches the database
+    with django_assert_num_queries(1):
+        response = status_client.get(reverse("account_status"))
+    assert "account Pending" in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_account_status_content_is_rendered_once(status_client):
+    response = status_client.get(reverse("account_status"))
+    templates = [template.name for template in response.templates]
+    assert "accounts/account_status_content.html" not in templates
+    assert "accounts/base.html" in templates
+    # The layout, with the logout form's CSRF token, is rendered per request
+    assert "csrfmiddlewaretoken" in response.content.decode()
+    assert "Please wait for review." in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_account_save_invalidates_cached_status(
+    status_client, account, admin_user, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        account.status = "additional_docs_required"
+        account.additional_docs_reason = "Proof of address"
+        account.save()
+
+    response = status_client.get(reverse("account_status"))
+    assert "Proof of address" in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_bulk_review_invalidates_cached_status(
+    status_client, admin_user, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        Account.objects.all().bulk_review("rejected", admin_user, reason="Duplicate")
+
+    response = status_client.get(reverse("account_status"))
+    assert "Duplicate" in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_password_change_invalidates_cached_user(
+    status_client, regular_user, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        regular_user.set_password("changedpass123")
+        regular_user.save()
+
+    response = status_client.get(reverse("account_status"))
+    assert response.status_code == 302
+    assert response.url.startswith(reverse("login"))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "fields",
+    [{"is_active": False}, {"password": "!"}],
+    ids=["deactivated", "password"],
+)
+def test_user_updated_without_signals_is_logged_out_once_bumped(
+    status_client, regular_user, fields, django_capture_on_commit_callbacks
+):
+    # update() sends no post_save, so its callers retire the snapshot
+    with django_capture_on_commit_callbacks(execute=True):
+        User.objects.filter(pk=regular_user.pk).update(**fields)
+        bump_user_accounts(regular_user.pk)
+
+    response = status_client.get(reverse("account_status"))
+    assert response.status_code == 302
+    assert response.url.startswith(reverse("login"))
+
+
+def test_file_cache_culls_at_most_once_per_interval(tmp_path):
+    cache = FileBasedCache(
+        str(tmp_path), {"OPTIONS": {"MAX_ENTRIES": 2, "CULL_INTERVAL": 60}}
+    )
+    for i in range(5):
+        cache.set(f"key{i}", i)
+    # Culled before the first set only; the others wait for the next interval
+    assert len(cache._list_cache_files()) == 5
@@ -0,0 +1,263 @@
+import json
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+from accounts.exports import EXPORT_COLUMNS
+from accounts.management.commands import import_accounts
+from accounts.models import Account
+
+
+@pytest.mark.django_db
+def test_benchmark_account_indexes_rolls_back_seeded_rows():
+    out = StringIO()
+    call_command("benchmark_account_indexes", rows=50, repeat=1, seed=1, stdout=out)
+
+    output = out.getvalue()
+    assert "Seeded 50 accounts" in output
+    assert "account_status_created_idx" in output
+    assert Account.objects.count() == 0
+
+
+def test_benchmark_account_indexes_refuses_a_deployed_database(settings):
+    settings.IS_DEPLOYED = True
+    with pytest.raises(CommandError, match="--force"):
+        call_command("benchmark_account_indexes", rows=50, stdout=StringIO())
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("handler", ["asgi", "wsgi"])
+def test_benchmark_views_reports_each_view(handler):
+    out = StringIO()
+    call_command(
+        "benchmark_views",
+        handler=handler,
+        concurrency=2,
+        requests=8,
+        views="account_status,home",
+        json=True,
+        stdout=out,
+    )
+
+    results = json.loads(out.getvalue())
+    assert results["total"]["requests"] == 8
+    assert set(results["views"]) == {"account_status", "home"}
+    assert results["views"]["home"]["p99_ms"] > 0
+    # SQLite has no connection pool
+    assert results["db_pool"] is None
+    assert not User.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_loadtest_runs_applicant_journeys():
+    out = StringIO()
+    call_command("loadtest", journeys=2, concurrency=2, polls=1, json=True, stdout=out)
+
+    results = json.loads(out.getvalue())
+    assert results["total"]["errors"] == 0
+    assert {name: r["requests"] for name, r in results["urls"].items()} == {
+        "register": 4,
+        "account_status": 2,
+        "admin:accounts_account_changelist": 2,
+        "congratulations": 2,
+    }
+    assert not User.objects.exists()
+
+
+@pytest.mark.django_db
+def test_benchmark_status_pages_compares_cached_rendering():
+    out = StringIO()
+    call_command("benchmark_status_pages", accounts=8, repeat=2, json=True, stdout=out)
+
+    results = json.loads(out.getvalue())
+    assert {(r["page"], r["mode"]) for r in results} == {
+        ("account_status", "before"),
+        ("account_status", "after"),
+        ("congratulations", "before"),
+        ("congratulations", "after"),
+    }
+    assert sum(r["requests"] for r in results if r["mode"] == "after") == 16
+    assert not User.objects.exists()
+
+
+@pytest.mark.django_db
+def test_benchmark_sessions_reports_queries_per_profile():
+    out = StringIO()
+    call_command("benchmark_sessions", requests=3, json=True, stdout=out)
+
+    results = {r["profile"]: r for r in json.loads(out.getvalue())}
+    assert results["db"]["queries_per_request"] == 1
+    assert results["cached_db"]["queries_per_request"] == 0
+    assert results["signed_cookies"]["queries_per_request"] == 0
+    assert results["signed_cookies"]["login_queries"] < results["db"]["login_queries"]
+    assert not User.objects.exists()
+
+
+@pytest.mark.django_db
+def test_import_accounts_inserts_valid_rows_and_writes_rejects(tmp_path, account):
+    source = tmp_path / "applications.csv"
+    source.write_text(
+        "username,email,first_name,last_name,phone_number,address\n"
+        "alice,alice@example.com,Alice,Smith,+1 555-0100,1 Main St\n"
+        "bob,bob@example.com,Bob,Jones,not-a-phone,2 Main St\n"
+        f"carol,carol@example.com,Carol,Lee,{account.phone_number},3 Main St\n"
+        "ALICE,alice2@example.com,Alice,Twin,+1 555-0101,4 Main St\n"
+        "dave,dave@example.com,Dave,Kim,+1 555-0102,5 Main St\n"
+    )
+    out = StringIO()
+    call_command("import_accounts", str(source), batch_size=4, stdout=out)
+
+    assert "Imported 2 accounts and rejected 3 rows" in out.getvalue()
+    imported = Account.objects.filter(user__username__in=["alice", "dave"])
+    assert imported.count() == 2
+    assert all(a.status == "pending" for a in imported)
+    alice = User.objects.get(username="alice")
+    assert not alice.has_usable_password()
+    assert alice.accounts.get().status_events.get().change_method == "import"
+
+    rejects = [
+        json.loads(line)
+        for line in (tmp_path / "applications.csv.rejects.jsonl")
+        .read_text()
+        .splitlines()
+    ]
+    assert [(r["line"], sorted(r["errors"])) for r in rejects] == [
+        (3, ["phone_number"]),
+        (4, ["phone_number"]),
+        (5, ["username"]),
+    ]
+
+
+@pytest.mark.django_db
+def test_import_accounts_reads_jsonl(tmp_path):
+    source = tmp_path / "applications.jsonl"
+    row = {
+        "username": "erin",
+        "email": "erin@example.com",
+        "first_name": "Erin",
+        "last_name": "Park",
+        "phone_number": "+1 555-0199",
+        "address": "6 Main St",
+    }
+    source.write_text(json.dumps(row) + "\n\n{broken\n")
+    out = StringIO()
+    call_command("import_accounts", str(source), stdout=out)
+
+    assert "Imported 1 accounts and rejected 1 rows" in out.getvalue()
+    assert Account.objects.get(user__username="erin").phone_number == "+1 555-0199"
+
+
+IMPORT_HEADER = "username,email,first_name,last_name,phone_number,address\n"
+
+
+@pytest.mark.django_db
+def test_import_accounts_rejects_usernames_taken_in_another_case(tmp_path, account):
+    source = tmp_path / "applications.csv"
+    source.write_text(
+        IMPORT_HEADER + "TestUser,t@example.com,Test,User,+1 555-0100,1 Main St\n"
+    )
+    out = StringIO()
+    call_command("import_accounts", str(source), stdout=out)
+
+    assert "Imported 0 accounts and rejected 1 rows" in out.getvalue()
+    assert not User.objects.filter(username="TestUser").exists()
+
+
+@pytest.mark.django_db
+def test_import_accounts_rejects_only_rows_lost_to_a_concurrent_insert(
+    tmp_path, monkeypatch
+):
+    validate_batch = import_accounts._validate_batch
+
+    def validate_then_register_bob(batch):
+        result = validate_batch(batch)
+        User.objects.create_user("bob")
+        return result
+
+    monkeypatch.setattr(import_accounts, "_validate_batch", validate_then_register_bob)
+    source = tmp_path / "applications.csv"
+    source.write_text(
+        IMPORT_HEADER
+        + "".join(
+            f"{name},{name}@example.com,{name},Smith,+1 555-010{i},{i} Main St\n"
+            for i, name in enumerate(["alice", "bob", "carol", "dave"])
+        )
+    )
+    out = StringIO()
+    call_command("import_accounts", str(source), stdout=out)
+
+    assert "Imported 3 accounts and rejected 1 rows" in out.getvalue()
+    rejects = (tmp_path / "applications.csv.rejects.jsonl").read_text().splitlines()
+    assert [json.loads(line)["row"]["username"] for line in rejects] == ["bob"]
+
+
+@pytest.mark.django_db
+def test_import_accounts_splits_batches_on_conflicts_from_copy(monkeypatch):
+    class ConflictingCursor:
+        def copy(self, sql):
+            # What psycopg raises, untranslated by Django's cursor wrapper
+            raise connection.Database.IntegrityError("duplicate key value")
+
+    def copy_rows(rows, password, now):
+        # COPY is PostgreSQL only; bob's row fails like it would there
+        if any(data["username"] == "bob" for _, _, data in rows):
+            import_accounts._copy(ConflictingCursor(), User, ["username"], [])
+        return import_accounts._bulk_create_rows(rows, password, now)
+
+    monkeypatch.setattr(import_accounts, "_copy_rows", copy_rows)
+    accepted, failed = import_accounts._validate_batch(
+        [
+            (
+                i + 2,
+                {
+                    "username": name,
+                    "email": f"{name}@example.com",
+                    "first_name": name,
+                    "last_name": "Smith",
+                    "phone_number": f"+1 555-010{i}",
+                    "address": f"{i} Main St",
+                },
+            )
+            for i, name in enumerate(["alice", "bob", "carol", "dave"])
+        ]
+    )
+    assert not failed
+
+    conflicts = import_accounts._insert_or_split(accepted, use_copy=True)
+
+    assert [raw["username"] for _, raw, _ in conflicts] == ["bob"]
+    assert set(User.objects.values_list("username", flat=True)) == {
+        "alice",
+        "carol",
+        "dave",
+    }
+
+
+@pytest.mark.django_db
+def test_import_accounts_leaves_no_rejects_file_for_missing_columns(tmp_path):
+    source = tmp_path / "applications.csv"
+    source.write_text("username,email\nalice,alice@example.com\n")
+
+    with pytest.raises(CommandError, match="phone_number"):
+        call_command("import_accounts", str(source), stdout=StringIO())
+    assert not (tmp_path / "applications.csv.rejects.jsonl").exists()
+
+
+@pytest.mark.django_db
+def test_export_accounts_filters_by_status(tmp_path, account, admin_user):
+    Account.objects.filter(pk=account.pk).bulk_review("approved", admin_user)
+    output = tmp_path / "accounts.jsonl"
+    call_command(
+        "export_accounts", format="jsonl", output=str(output), status=["approved"]
+    )
+
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [(row["id"], row["status"]) for row in rows] == [(account.id, "approved")]
+    assert rows[0]["reviewed_by"] == "admin"
+
+    out = StringIO()
+    call_command("export_accounts", status=["pending"], stdout=out)
+    assert out.getvalue().splitlines() == [",".join(EXPORT_COLUMNS)]
@@ -1,6 +1,7 @@
 import pytest
 
 from accounts.forms import AccountForm, CombinedRegistrationForm
+from accounts.phone import normalize_phone
 
 
 @pytest.mark.django_db
@@ -105,3 +106,55 @@ def test_combined_registration_form_save():
     assert user.first_name == "Test"
     assert user.last_name == "User"
     assert user.email == "test@example.com"
+
+
+@pytest.mark.django_db
+def test_account_form_rejects_number_registered_in_another_format(account):
+    form = AccountForm(data={"phone_number": "(123) 456 7890", "address": "1 St"})
+    assert not form.is_valid()
+    assert form.errors["phone_number"] == [
+        "Account with this Phone number already exists."
+    ]
+
+    # The account's own number is not a duplicate of itself
+    form = AccountForm(
+        data={"phone_number": "(123) 456 7890", "address": "1 St"}, instance=account
+    )
+    assert form.is_valid()
+
+
+@pytest.mark.parametrize(
+    "value, normalized",
+    [
+        ("(02) 1234-5678", "+886212345678"),
+        ("02 1234 5678", "+886212345678"),
+        ("+886 2 1234 5678", "+886212345678"),
+        ("00886212345678", "+886212345678"),
+        ("+1 (555) 010-0000", "+15550100000"),
+        ("invalid-phone", None),
+        ("1+2", None),
+        ("+1234567890123456", None),
+    ],
+)
+def test_normalize_phone(settings, value, normalized):
+    settings.PHONE_DEFAULT_COUNTRY_CODE = "886"
+    assert normalize_phone(value) == normalized
+
+
+@pytest.mark.django_db
+def test_combined_registration_form_checks_each_unique_value_once(
+    django_assert_num_queries,
+):
+    form_data = {
+        "username": "testuser",
+        "first_name": "Test",
+        "last_name": "User",
+        "email": "test@example.com",
+        "password1": "testpassword123",
+        "password2": "testpassword123",
+        "phone_number": "123-456-7890",
+        "address": "123 Test St, Test City, TC 12345",
+    }
+    # Case-insensitive username lookup and the phone number probe
+    with django_assert_num_queries(2):
+        assert CombinedRegistrationForm(data=form_data).is_valid()
@@ -0,0 +1,58 @@
+import pytest
+from django.contrib.auth import authenticate
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password, make_password
+from django.urls import reverse
+
+from accounts import hashing
+
+
+def test_make_password_runs_inline_without_workers(settings):
+    settings.PASSWORD_HASHING_WORKERS = 0
+    before = hashing.hashing_stats().get("make_password", {"count": 0})["count"]
+
+    encoded = hashing.make_password("s3cret-pass")
+
+    assert check_password("s3cret-pass", encoded)
+    assert hashing.check_password("s3cret-pass", encoded)
+    assert not hashing.check_password("wrong-pass", encoded)
+    assert hashing.hashing_stats()["make_password"]["count"] == before + 1
+
+
+def test_hashes_are_computed_in_the_worker_pool(settings):
+    settings.PASSWORD_HASHING_WORKERS = 1
+    try:
+        encoded = hashing.make_password("s3cret-pass")
+        assert hashing._executor is not None
+        assert hashing.check_password("s3cret-pass", encoded)
+    finally:
+        hashing.shutdown()
+    assert check_password("s3cret-pass", encoded)
+
+
+@pytest.mark.django_db
+def test_login_rehashes_outdated_password(user):
+    # Stored with a hasher that is no longer preferred
+    user.password = make_password("testpass123", hasher="pbkdf2_sha1")
+    user.save()
+
+    assert authenticate(username="testuser", password="testpass123") == user
+    user.refresh_from_db()
+    assert user.password.startswith("pbkdf2_sha256$")
+    assert authenticate(username="testuser", password="wrong") is None
+
+
+@pytest.mark.django_db
+def test_failed_login_is_not_retried_by_model_backend(user, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("ModelBackend hashed the password again")
+
+    monkeypatch.setattr(ModelBackend, "authenticate", fail)
+    assert authenticate(username="testuser", password="wrong") is None
+    assert authenticate(username="nobody", password="wrong") is None
+
+
+@pytest.mark.django_db
+def test_sessions_logged_in_by_model_backend_stay_valid(client, user):
+    client.force_login(user, backend="django.contrib.auth.backends.ModelBackend")
+    assert client.get(reverse("home")).wsgi_request.user == user
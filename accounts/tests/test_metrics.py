@@ -0,0 +1,110 @@
+import json
+import os
+import subprocess
+
+import pytest
+from django.urls import reverse
+
+from accounts import metrics
+
+
+@pytest.fixture
+def metrics_client(client, settings):
+    settings.METRICS_TOKEN = "scrape-token"
+    client.defaults["HTTP_AUTHORIZATION"] = "Bearer scrape-token"
+    return client
+
+
+def sample(text, line_start):
+    """Value of the first exposition line starting with ``line_start``"""
+    for line in text.splitlines():
+        if line.startswith(line_start):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+@pytest.mark.django_db
+def test_metrics_record_latency_queries_and_status_per_view(metrics_client, account):
+    client = metrics_client
+    client.login(username="testuser", password="testpass123")
+    before = client.get(reverse("metrics")).content.decode()
+    response = client.get(reverse("account_status"))
+
+    text = client.get(reverse("metrics")).content.decode()
+    requests = (
+        'accounts_http_requests_total{view="account_status",method="GET",status="200"}'
+    )
+    assert sample(text, requests) == sample(before, requests) + 1
+    count = 'accounts_http_request_duration_seconds_count{view="account_status"}'
+    assert sample(text, count) == sample(before, count) + 1
+    # The async view's queries run in another thread and are still counted
+    queries = 'accounts_db_queries_total{view="account_status"}'
+    assert sample(text, queries) >= sample(before, queries) + 2
+    size = 'accounts_http_response_bytes_total{view="account_status"}'
+    assert sample(text, size) == sample(before, size) + len(response.content)
+    assert "# TYPE accounts_http_request_duration_seconds histogram" in text
+    assert "accounts_audit_log_written_total" in text
+
+
+@pytest.mark.django_db
+def test_metrics_add_up_the_files_of_other_workers(client, settings):
+    client.get(reverse("login"))
+    metrics.flush()
+    # Another worker with the same totals
+    os.replace(
+        os.path.join(settings.METRICS_DIR, f"{os.getpid()}.json"),
+        os.path.join(settings.METRICS_DIR, "1.json"),
+    )
+
+    text = metrics.render()
+    own = metrics.snapshot()["requests"][("login", "GET", "200")]
+    line = 'accounts_http_requests_total{view="login",method="GET",status="200"}'
+    assert sample(text, line) == own * 2
+
+
+@pytest.mark.django_db
+def test_metrics_token(client, settings):
+    settings.METRICS_TOKEN = "scrape-token"
+    assert client.get(reverse("metrics")).status_code == 401
+    response = client.get(
+        reverse("metrics"), headers={"Authorization": "Bearer scrape-token"}
+    )
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+
+
+@pytest.mark.django_db
+def test_metrics_keep_the_counters_of_workers_that_are_gone(client, settings):
+    client.get(reverse("login"))
+    metrics.flush()
+    own_file = os.path.join(settings.METRICS_DIR, f"{os.getpid()}.json")
+    with open(own_file) as f:
+        data = json.load(f)
+    data["audit_log_queue_depth"] = [[[], 7]]
+    exited = subprocess.Popen(["true"])
+    exited.wait()
+    dead_file = os.path.join(settings.METRICS_DIR, f"{exited.pid}.json")
+    with open(dead_file, "w") as f:
+        json.dump(data, f)
+    # A live worker that stopped flushing, e.g. because it hangs
+    stale_file = os.path.join(settings.METRICS_DIR, "1.json")
+    with open(stale_file, "w") as f:
+        json.dump(data, f)
+    os.utime(stale_file, (0, 0))
+
+    own = metrics.snapshot()["requests"][("login", "GET", "200")]
+    line = 'accounts_http_requests_total{view="login",method="GET",status="200"}'
+    for _ in range(2):
+        text = metrics.render()
+        # Counters never go down, which Prometheus would read as a reset
+        assert sample(text, line) == own * 3
+        # Gauges of the exited and the stale worker are dropped
+        assert sample(text, "accounts_audit_log_queue_depth") < 7
+        assert not os.path.exists(dead_file)
+
+
+@pytest.mark.django_db
+def test_metrics_need_a_token_outside_debug(client, settings):
+    assert client.get(reverse("metrics")).status_code == 403
+    settings.DEBUG = True
+    assert client.get(reverse("metrics")).status_code == 200
@@ -0,0 +1,48 @@
+import pytest
+from django.test import RequestFactory
+from django.urls import reverse
+
+from accounts.middleware import AccountMiddleware
+
+
+@pytest.mark.django_db
+def test_account_status_loads_user_and_account_in_one_query(
+    client, regular_user, account, admin_user, django_assert_num_queries
+):
+    account.status = "rejected"
+    account.rejection_reason = "Test rejection reason"
+    account.reviewed_by = admin_user
+    account.save()
+    client.login(username="testuser", password="testpass123")
+
+    # The session lookup, then the user, account and reviewer in one join
+    with django_assert_num_queries(2):
+        response = client.get(reverse("account_status"))
+    assert response.status_code == 200
+    assert "Reviewed by admin" in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_request_account_is_none_for_staff_without_account(client, admin_user):
+    client.login(username="admin", password="adminpass123")
+    request = RequestFactory().get("/")
+    request.session = client.session
+
+    AccountMiddleware(lambda request: None).process_request(request)
+
+    assert request.user == admin_user
+    assert not request.account
+
+
+@pytest.mark.django_db
+def test_request_user_is_anonymous_after_password_change(client, regular_user, account):
+    client.login(username="testuser", password="testpass123")
+    regular_user.set_password("changedpass123")
+    regular_user.save()
+    request = RequestFactory().get("/")
+    request.session = client.session
+
+    AccountMiddleware(lambda request: None).process_request(request)
+
+    assert not request.user.is_authenticated
+    assert not request.account
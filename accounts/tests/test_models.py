@@ -1,9 +1,12 @@
 import pytest
+import structlog
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
-from accounts.models import Account
+from accounts.models import Account, AccountStatusEvent
 
 User = get_user_model()
 
@@ -77,3 +80,182 @@ def test_reviewed_by_can_be_null(user):
     )
     assert application.reviewed_by is None
     assert application.reviewed_at is None
+
+
+@pytest.mark.django_db
+def test_account_create_query_count(user, django_assert_num_queries):
+    # Unique check on phone_number, the INSERT and its status history row
+    with django_assert_num_queries(3):
+        Account.objects.create(
+            user=user, phone_number="123-456-7890", address="123 Test St"
+        )
+
+
+@pytest.mark.django_db
+def test_account_create_without_unique_check_query_count(
+    user, django_assert_num_queries
+):
+    # The form already checked the phone number: only the two INSERTs
+    with django_assert_num_queries(2):
+        Account(user=user, phone_number="123-456-7890", address="123 Test St").save(
+            validate_unique=False
+        )
+
+
+@pytest.mark.django_db
+def test_duplicate_insert_raises_field_error(account, admin_user):
+    duplicate = Account(user=admin_user, phone_number="(123) 456 7890", address="-")
+    with pytest.raises(ValidationError) as excinfo, transaction.atomic():
+        duplicate.save(validate_unique=False)
+
+    assert excinfo.value.message_dict == {
+        "phone_number": ["Account with this Phone number already exists."]
+    }
+    assert Account.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_account_status_change_query_count(account, admin_user):
+    loaded = Account.objects.get(pk=account.pk)
+    loaded.status = "rejected"
+    loaded.rejection_reason = "Test reject reason"
+    loaded.reviewed_by = admin_user
+    loaded.reviewed_at = timezone.now()
+
+    with structlog.testing.capture_logs() as logs:
+        with CaptureQueriesContext(connection) as queries:
+            loaded.save()
+
+    assert [q["sql"].split()[0] for q in queries] == ["UPDATE", "INSERT"]
+    assert logs[0]["event"] == "account_status_changed"
+    assert logs[0]["previous_status"] == "pending"
+    assert logs[0]["new_status"] == "rejected"
+    assert logs[0]["reviewer_id"] == admin_user.id
+    assert logs[0]["reviewer_username"] == admin_user.username
+    # The account owner was never loaded, so only its id is logged
+    assert logs[0]["user_id"] == account.user_id
+    assert logs[0]["username"] is None
+
+
+@pytest.mark.django_db
+def test_account_save_without_changes_query_count(account, django_assert_num_queries):
+    loaded = Account.objects.get(pk=account.pk)
+
+    with structlog.testing.capture_logs() as logs:
+        with django_assert_num_queries(1):
+            loaded.save()
+
+    assert logs == []
+
+
+@pytest.mark.django_db
+def test_account_status_change_detected_after_refresh(account):
+    account.refresh_from_db()
+    account.status = "approved"
+
+    with structlog.testing.capture_logs() as logs:
+        account.save()
+        account.save()
+
+    assert [log["event"] for log in logs] == ["account_status_changed"]
+    assert logs[0]["previous_status"] == "pending"
+
+
+@pytest.mark.django_db
+def test_bulk_review_updates_in_chunks(user, admin_user):
+    accounts = [
+        Account.objects.create(
+            user=user, phone_number=f"123-456-789{i}", address="123 Test St"
+        )
+        for i in range(3)
+    ]
+    accounts[0].status = "approved"
+    accounts[0].save()
+
+    with CaptureQueriesContext(connection) as queries:
+        updated = Account.objects.all().bulk_review(
+            "rejected", admin_user, reason="Duplicate", chunk_size=2
+        )
+    assert updated == 3
+    assert [q["sql"].split()[0] for q in queries].count("UPDATE") == 2
+
+    updated = Account.objects.all().bulk_review("rejected", admin_user, reason="Dup")
+    assert updated == 0
+    assert set(Account.objects.values_list("rejection_reason", flat=True)) == {
+        "Duplicate"
+    }
+
+
+@pytest.mark.django_db
+def test_bulk_review_requires_reason(account, admin_user):
+    with pytest.raises(ValidationError):
+        Account.objects.all().bulk_review("additional_docs_required", admin_user)
+
+
+@pytest.mark.django_db
+def test_status_events_record_account_history(account, admin_user):
+    account.status = "rejected"
+    account.rejection_reason = "Test reject reason"
+    account.reviewed_by = admin_user
+    account.save()
+    account.address = "456 Test St"
+    account.save()
+
+    history = list(AccountStatusEvent.objects.for_account(account.id))
+    assert [(e.previous_status, e.new_status) for e in history] == [
+        ("pending", "rejected"),
+        ("", "pending"),
+    ]
+    assert history[0].reviewer == admin_user
+    assert history[0].reason == "Test reject reason"
+    assert list(AccountStatusEvent.objects.for_reviewer(admin_user.id)) == history[:1]
+
+    with pytest.raises(ValueError):
+        history[0].save()
+
+
+@pytest.mark.django_db
+def test_bulk_review_records_status_events(account, admin_user):
+    Account.objects.all().bulk_review("approved", admin_user)
+
+    event = AccountStatusEvent.objects.for_reviewer(admin_user.id).get()
+    assert event.account_id == account.id
+    assert event.previous_status == "pending"
+    assert event.new_status == "approved"
+    assert event.change_method == "bulk_review"
+
+
+@pytest.mark.django_db
+def test_save_keeps_phone_normalized_in_sync(account):
+    assert account.phone_normalized == "+8861234567890"
+    account.phone_number = "+1 (555) 000-1111"
+    account.save(update_fields=["phone_number"])
+    account.refresh_from_db()
+    assert account.phone_normalized == "+15550001111"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "term, found",
+    [
+        ("123-456", True),
+        ("(123) 4567890", True),
+        ("456-7890", False),
+        ("test@example.com", True),
+        ("TEST@EXAMPLE.COM", True),
+        ("st@example.com", False),
+        ("estus", True),
+        ("example", True),
+        ("nobody", False),
+    ],
+)
+def test_search_routes_terms_to_indexed_lookups(account, term, found):
+    assert Account.objects.search(term).exists() is found
+
+
+@pytest.mark.django_db
+def test_search_finds_numeric_username_fragments(account):
+    trader = User.objects.create_user("trader42")
+    Account.objects.create(user=trader, phone_number="+1 555-0142", address="1 St")
+
+    assert list(Account.objects.search("42")) == [trader.accounts.get()]
@@ -0,0 +1,109 @@
+import cProfile
+import os
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+
+from accounts import profiling
+from accounts.profiling import RequestProfile
+
+
+@pytest.fixture
+def profiler_dir(settings, tmp_path):
+    settings.PROFILER_DIR = str(tmp_path / "profiles")
+    return settings.PROFILER_DIR
+
+
+def read_profile(profiler_dir, profile_id):
+    files = {}
+    for extension in ("txt", "prof", "collapsed"):
+        with open(os.path.join(profiler_dir, f"{profile_id}.{extension}"), "rb") as f:
+            files[extension] = f.read()
+    return files
+
+
+@pytest.mark.django_db
+def test_staff_request_is_profiled_by_query_parameter(client, admin_user, profiler_dir):
+    client.force_login(admin_user)
+    url = reverse("admin:accounts_account_changelist")
+
+    response = client.get(url, {"_profile": "1"})
+
+    # The admin never sees the parameter, so it does not take it for a filter
+    assert response.status_code == 200
+    profile = read_profile(profiler_dir, response["X-Profile-Id"])
+    report = profile["txt"].decode()
+    assert report.startswith(f"GET {url}?_profile=1 -> 200 in ")
+    assert "cumulative" in report
+    for line in profile["collapsed"].decode().splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert stack and int(count) > 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_view_is_profiled_by_header(admin_user, profiler_dir):
+    client = AsyncClient()
+    async_to_sync(client.aforce_login)(admin_user)
+
+    response = async_to_sync(client.get)(
+        reverse("admin_without_account"), headers={"X-Profile": "1"}
+    )
+
+    assert response.status_code == 200
+    profile = read_profile(profiler_dir, response["X-Profile-Id"])
+    assert b"admin_without_account" in profile["txt"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("staff, url_name", [(False, "home"), (True, "metrics")])
+def test_other_requests_are_not_profiled(
+    client, regular_user, staff, url_name, profiler_dir
+):
+    regular_user.is_staff = staff
+    regular_user.save()
+    client.force_login(regular_user)
+
+    response = client.get(reverse(url_name), headers={"X-Profile": "1"})
+
+    assert "X-Profile-Id" not in response
+    assert not os.path.exists(profiler_dir)
+
+
+@pytest.mark.django_db
+def test_only_one_request_is_profiled_at_a_time(client, admin_user, profiler_dir):
+    client.force_login(admin_user)
+
+    with RequestProfile():
+        response = client.get(reverse("admin:index"), headers={"X-Profile": "1"})
+
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response
+    assert response["X-Profile-Skipped"] == "Another request is being profiled"
+    # The profiler is free again afterwards
+    response = client.get(reverse("admin:index"), headers={"X-Profile": "1"})
+    assert "X-Profile-Id" in response
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_view_is_served_when_another_tool_profiles_the_process(
+    admin_user, profiler_dir, monkeypatch
+):
+    class ActiveTool(cProfile.Profile):
+        def enable(self, *args, **kwargs):
+            # What cProfile raises on Python 3.12+ next to another profiler
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(profiling.cProfile, "Profile", ActiveTool)
+    client = AsyncClient()
+    async_to_sync(client.aforce_login)(admin_user)
+    url = reverse("admin_without_account")
+
+    response = async_to_sync(client.get)(url, headers={"X-Profile": "1"})
+
+    assert response.status_code == 200
+    assert "already active" in response["X-Profile-Skipped"]
+    monkeypatch.undo()
+    response = async_to_sync(client.get)(url, headers={"X-Profile": "1"})
+    assert "X-Profile-Id" in response
@@ -0,0 +1,192 @@
+"""
+Query budgets of the account views and admin pages, and the plans of the hot
+Account queries. A change that adds a query or loses an index fails here;
+raise a budget only together with the reason for the extra query.
+"""
+
+import re
+
+import pytest
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.management.commands.benchmark_account_indexes import hot_queries
+from accounts.models import Account
+from accounts.seeding import seed_accounts
+
+
+@pytest.fixture
+def applicant_client(client, regular_user):
+    client.login(username="testuser", password="testpass123")
+    return client
+
+
+def warm(client, url):
+    """The first hit learns the account id, the second caches the account"""
+    client.get(url)
+    client.get(url)
+
+
+def review(account, status, reviewer, **fields):
+    account.status = status
+    account.reviewed_by = reviewer
+    account.reviewed_at = timezone.now()
+    for name, value in fields.items():
+        setattr(account, name, value)
+    account.save()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name", ["register", "login"])
+def test_anonymous_pages_do_not_query(client, url_name, django_assert_num_queries):
+    with django_assert_num_queries(0):
+        response = client.get(reverse(url_name))
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_pending_account_status(applicant_client, account, django_assert_num_queries):
+    url = reverse("account_status")
+    # The session, then the user, account and reviewer in one join
+    with django_assert_num_queries(2):
+        assert applicant_client.get(url).status_code == 200
+
+    warm(applicant_client, url)
+    # Only the session once the account is cached
+    with django_assert_num_queries(1):
+        assert applicant_client.get(url).status_code == 200
+
+
+@pytest.mark.django_db
+def test_rejected_account_status(
+    applicant_client, account, admin_user, django_assert_num_queries
+):
+    review(account, "rejected", admin_user, rejection_reason="Incomplete")
+    url = reverse("account_status")
+    with django_assert_num_queries(2):
+        response = applicant_client.get(url)
+    assert "Reviewed by admin" in response.content.decode()
+
+    warm(applicant_client, url)
+    with django_assert_num_queries(1):
+        assert applicant_client.get(url).status_code == 200
+
+
+@pytest.mark.django_db
+def test_approved_account_congratulations(
+    applicant_client, account, admin_user, django_assert_num_queries
+):
+    review(account, "approved", admin_user, approved_at=timezone.now())
+    url = reverse("congratulations")
+    with django_assert_num_queries(2):
+        assert applicant_client.get(url).status_code == 200
+
+    warm(applicant_client, url)
+    with django_assert_num_queries(1):
+        assert applicant_client.get(url).status_code == 200
+    with django_assert_num_queries(1):
+        assert applicant_client.get(reverse("account_status")).status_code == 302
+
+
+@pytest.mark.django_db
+def test_additional_docs_supplement_form(
+    applicant_client, account, admin_user, django_assert_num_queries
+):
+    review(
+        account,
+        "additional_docs_required",
+        admin_user,
+        additional_docs_reason="Proof of address",
+    )
+    url = reverse("supplement_form")
+    with django_assert_num_queries(2):
+        assert applicant_client.get(url).status_code == 200
+
+
+@pytest.mark.django_db
+def test_staff_without_account(client, admin_user, django_assert_num_queries):
+    client.force_login(admin_user)
+    # The session, the account lookup that finds none, then the user
+    with django_assert_num_queries(3):
+        assert client.get(reverse("admin_without_account")).status_code == 200
+    with django_assert_num_queries(3):
+        assert client.get(reverse("account_status")).status_code == 302
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "url_name, queries",
+    [
+        ("admin:index", 4),
+        # The session, the staff user (as for admin_without_account), the
+        # count and the page; the reviewer filter choices are cached
+        ("admin:accounts_account_changelist", 5),
+    ],
+)
+def test_admin_pages(
+    client, admin_user, account, url_name, queries, django_assert_num_queries
+):
+    client.force_login(admin_user)
+    url = reverse(url_name)
+    client.get(url)
+    with django_assert_num_queries(queries):
+        assert client.get(url).status_code == 200
+
+
+@pytest.mark.django_db
+def test_admin_change_page(client, admin_user, account, django_assert_num_queries):
+    client.force_login(admin_user)
+    # ContentType lookups are cached per process, so whether earlier tests
+    # loaded it would otherwise change the count
+    ContentType.objects.clear_cache()
+    # The session, the staff user, the account, its status events, its user
+    # and the content type
+    with django_assert_num_queries(7):
+        response = client.get(
+            reverse("admin:accounts_account_change", args=[account.pk])
+        )
+    assert response.status_code == 200
+
+
+def sequential_scans(plan, table):
+    """Lines of an EXPLAIN plan that read all of ``table`` without an index"""
+    if connection.vendor == "postgresql":
+        pattern = rf"Seq Scan on {table}\b"
+    else:
+        pattern = rf"\bSCAN {table}\b(?! USING)"
+    return [line for line in plan.splitlines() if re.search(pattern, line)]
+
+
+@pytest.fixture
+def seeded_reviewer():
+    reviewer = User.objects.create_user("reviewer", is_staff=True)
+    seed_accounts(2000, reviewers=[reviewer], seed=1)
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(f"ANALYZE {Account._meta.db_table}")
+            # A seeded table this small fits in a few pages, so PostgreSQL
+            # would rather scan it. With sequential scans priced out a Seq
+            # Scan only remains when no index can serve the query.
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        else:
+            cursor.execute("ANALYZE")
+    return reviewer
+
+
+@pytest.mark.django_db
+def test_hot_account_queries_use_indexes(seeded_reviewer):
+    queries = {
+        **hot_queries(seeded_reviewer.pk),
+        # The middleware's lookup behind every applicant page
+        "status_page": Account.objects.select_related("user", "reviewed_by").filter(
+            user_id=seeded_reviewer.pk
+        ),
+    }
+    for name, queryset in queries.items():
+        plan = queryset.explain()
+        assert not sequential_scans(plan, Account._meta.db_table), (
+            f"{name} reads the whole table:\n{plan}"
+        )
@@ -0,0 +1,64 @@
+import pytest
+import structlog
+from django.db import connection
+from django.urls import reverse
+
+from accounts import metrics, slow_queries
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        'SELECT "id" FROM "accounts_account" WHERE "id" IN (%s, %s) AND "status" = %s',
+        'SELECT "id"  FROM "accounts_account"\nWHERE "id" IN (1, 2, 3) AND "status" = \'pending\'',
+    ],
+)
+def test_fingerprint_folds_literals_and_in_lists(sql):
+    key, normalized = slow_queries.fingerprint(sql)
+    assert normalized == (
+        'SELECT "id" FROM "accounts_account" WHERE "id" IN (...) AND "status" = ?'
+    )
+    assert (
+        key
+        == slow_queries.fingerprint(
+            'SELECT "id" FROM "accounts_account" WHERE "id" IN (%s) AND "status" = %s'
+        )[0]
+    )
+
+
+@pytest.mark.django_db
+def test_slow_queries_are_logged_with_view_and_call_site(client, account, settings):
+    settings.SLOW_QUERY_MS = 0.000001
+    client.login(username="testuser", password="testpass123")
+
+    with (
+        connection.execute_wrapper(slow_queries.record),
+        structlog.testing.capture_logs() as logs,
+    ):
+        client.get(reverse("account_status"))
+
+    slow = [log for log in logs if log["event"] == "slow_query"]
+    account_lookup = next(log for log in slow if "accounts_account" in log["sql"])
+    assert account_lookup["view"] == "account_status"
+    assert "%s" not in account_lookup["sql"]
+    assert any("accounts/middleware.py" in frame for frame in account_lookup["stack"])
+    assert account_lookup["fingerprint"] in {
+        entry["fingerprint"] for entry in slow_queries.recent_queries()
+    }
+    assert 'accounts_slow_queries_total{view="account_status"}' in metrics.render()
+
+
+@pytest.mark.django_db
+def test_fast_queries_are_only_sampled(account, settings):
+    settings.SLOW_QUERY_MS = 60_000
+    settings.SLOW_QUERY_SAMPLE_RATE = 0
+    before = len(slow_queries.recent_queries())
+
+    with (
+        connection.execute_wrapper(slow_queries.record),
+        structlog.testing.capture_logs() as logs,
+    ):
+        list(type(account).objects.all())
+
+    assert not logs
+    assert len(slow_queries.recent_queries()) == before
@@ -1,9 +1,14 @@
 import pytest
+import structlog
 from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
-from accounts.models import Account
+from accounts.admin import ReviewerListFilter
+from accounts.models import Account, AccountStatusEvent
+from accounts.views import get_status_info
 
 
 @pytest.mark.django_db
@@ -30,6 +35,34 @@ def test_register_view_post(client):
     assert User.objects.filter(username="newuser").exists()
 
 
+@pytest.mark.django_db
+def test_register_view_reports_concurrent_duplicate_phone_on_form(
+    client, account, monkeypatch
+):
+    # Simulates another registration taking the number after validation
+    monkeypatch.setattr(
+        "accounts.forms.check_phone_available", lambda phone, account=None: phone
+    )
+    form_data = {
+        "username": "racer",
+        "first_name": "Race",
+        "last_name": "User",
+        "email": "racer@example.com",
+        "password1": "newpass123",
+        "password2": "newpass123",
+        "phone_number": "(123) 456-7890",
+        "address": "123 Test St",
+    }
+    response = client.post(reverse("register"), data=form_data)
+
+    assert response.status_code == 200
+    assert response.context["form"].errors["phone_number"] == [
+        "Account with this Phone number already exists."
+    ]
+    # The user created in the same transaction was rolled back
+    assert not User.objects.filter(username="racer").exists()
+
+
 @pytest.mark.django_db
 def test_login_required_for_supplement_form(client):
     response = client.get(reverse("supplement_form"))
@@ -137,6 +170,28 @@ def test_account_status_with_account(client, user):
     assert "Account Status" in response.content.decode()
 
 
+@pytest.mark.django_db
+def test_get_status_info_formats_only_the_current_status(
+    admin_user, account, django_assert_num_queries
+):
+    account.status = "rejected"
+    account.rejection_reason = "Incomplete address"
+    account.reviewed_by = admin_user
+    account.save()
+    account = Account.objects.select_related("reviewed_by").get(pk=account.pk)
+
+    with django_assert_num_queries(0):
+        status_info = get_status_info(account)
+    assert status_info.title == "account Rejected"
+    assert status_info.color == "danger"
+    assert status_info.message == (
+        "Your account was rejected. Reason: Incomplete address (Reviewed by admin)"
+    )
+
+    account.status = "unknown"
+    assert get_status_info(account).title == "account Pending"
+
+
 @pytest.mark.django_db
 def test_congratulations_requires_approved_account(client, user):
     client.login(username="testuser", password="testpass123")
@@ -206,6 +261,33 @@ def test_admin_can_access_account_admin(client, admin_user):
     assert response.status_code == 200
 
 
+@pytest.mark.django_db
+def test_admin_changelist_query_count_does_not_grow_with_rows(
+    client, admin_user, account
+):
+    client.login(username="admin", password="adminpass123")
+    Account.objects.filter(pk=account.pk).bulk_review("approved", admin_user)
+    # Fills the reviewer filter cache
+    client.get("/admin/accounts/account/")
+    with CaptureQueriesContext(connection) as one_row:
+        client.get("/admin/accounts/account/")
+
+    for i in range(5):
+        user = User.objects.create_user(username=f"listed{i}", password="x")
+        Account.objects.create(
+            user=user, phone_number=f"555-000{i}", address="1 Listed St"
+        )
+    Account.objects.bulk_review("rejected", admin_user, reason="Incomplete")
+    with CaptureQueriesContext(connection) as six_rows:
+        response = client.get("/admin/accounts/account/")
+
+    assert response.context["cl"].result_count == 6
+    assert len(six_rows) == len(one_row)
+    changelist_sql = str(response.context["cl"].result_list.query)
+    assert '"accounts_account"."address"' not in changelist_sql
+    assert 'LEFT OUTER JOIN "auth_user"' in changelist_sql
+
+
 @pytest.mark.django_db
 def test_admin_can_change_account_status(client, admin_user, regular_user, account):
     client.login(username="admin", password="adminpass123")
@@ -218,6 +300,8 @@ def test_admin_can_change_account_status(client, admin_user, regular_user, accou
             "status": "approved",
             "rejection_reason": "",
             "additional_docs_reason": "",
+            "status_events-TOTAL_FORMS": "0",
+            "status_events-INITIAL_FORMS": "0",
         },
     )
     account.refresh_from_db()
@@ -227,6 +311,73 @@ def test_admin_can_change_account_status(client, admin_user, regular_user, accou
     assert account.reviewed_at is not None
 
 
+@pytest.mark.django_db
+def test_admin_can_review_a_duplicate_left_by_the_phone_migration(
+    client, admin_user, account
+):
+    other = User.objects.create_user(username="other", password="pass12345")
+    duplicate = Account.objects.create(
+        user=other, phone_number="555-0100", address="2 Test St"
+    )
+    # What migration 0006 leaves for a number another account already has
+    Account.objects.filter(pk=duplicate.pk).update(
+        phone_number="(123) 456-7890", phone_normalized=None
+    )
+
+    client.login(username="admin", password="adminpass123")
+    response = client.post(
+        f"/admin/accounts/account/{duplicate.id}/change/",
+        {
+            "user": other.id,
+            "phone_number": "(123) 456-7890",
+            "address": "2 Test St",
+            "status": "rejected",
+            "rejection_reason": "Duplicate application",
+            "additional_docs_reason": "",
+            "status_events-TOTAL_FORMS": "0",
+            "status_events-INITIAL_FORMS": "0",
+        },
+    )
+
+    assert response.status_code == 302
+    duplicate.refresh_from_db()
+    assert duplicate.status == "rejected"
+    assert duplicate.phone_normalized is None
+
+
+@pytest.mark.django_db
+def test_admin_status_change_records_the_acting_reviewer(
+    client, admin_user, regular_user, account
+):
+    first_reviewer = User.objects.create_user(username="first", password="pass12345")
+    account.status = "additional_docs_required"
+    account.additional_docs_reason = "Proof of address"
+    account.reviewed_by = first_reviewer
+    account.save()
+
+    client.login(username="admin", password="adminpass123")
+    client.post(
+        f"/admin/accounts/account/{account.id}/change/",
+        {
+            "user": regular_user.id,
+            "phone_number": "123-456-7890",
+            "address": "123 Test St",
+            "status": "approved",
+            "rejection_reason": "",
+            "additional_docs_reason": "Proof of address",
+            "status_events-TOTAL_FORMS": "0",
+            "status_events-INITIAL_FORMS": "0",
+        },
+    )
+
+    event = AccountStatusEvent.objects.for_account(account.id).first()
+    assert event.new_status == "approved"
+    assert event.reviewer == admin_user
+    assert list(AccountStatusEvent.objects.for_reviewer(first_reviewer.id)) == [
+        AccountStatusEvent.objects.get(new_status="additional_docs_required")
+    ]
+
+
 @pytest.mark.django_db
 def test_admin_bulk_approve_sets_reviewer_fields(
     client, admin_user, regular_user, account
@@ -260,6 +411,149 @@ def test_admin_bulk_approve_sets_reviewer_fields(
     assert app2.reviewed_at is not None
 
 
+@pytest.mark.django_db
+def test_admin_bulk_approve_logs_status_change_per_account(
+    client, admin_user, regular_user, account
+):
+    client.login(username="admin", password="adminpass123")
+    with structlog.testing.capture_logs() as logs:
+        client.post(
+            "/admin/accounts/account/",
+            {"action": "approve_accounts", "_selected_action": [account.id]},
+        )
+
+    status_logs = [log for log in logs if log["event"] == "account_status_changed"]
+    assert len(status_logs) == 1
+    assert status_logs[0]["account_id"] == account.id
+    assert status_logs[0]["previous_status"] == "pending"
+    assert status_logs[0]["new_status"] == "approved"
+    assert status_logs[0]["reviewer_id"] == admin_user.id
+
+
+@pytest.mark.django_db
+def test_admin_reviewer_filter_lists_only_reviewers(
+    client, admin_user, account, django_capture_on_commit_callbacks
+):
+    client.login(username="admin", password="adminpass123")
+    response = client.get("/admin/accounts/account/")
+    assert "By reviewed by" not in response.content.decode()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Account.objects.filter(pk=account.pk).bulk_review("approved", admin_user)
+    response = client.get("/admin/accounts/account/")
+    reviewer_filter = next(
+        spec
+        for spec in response.context["cl"].filter_specs
+        if isinstance(spec, ReviewerListFilter)
+    )
+    # regular_user owns an account but has reviewed nothing
+    assert reviewer_filter.lookup_choices == [(admin_user.pk, "admin")]
+
+    with CaptureQueriesContext(connection) as queries:
+        client.get("/admin/accounts/account/")
+    assert not any("DISTINCT" in query["sql"] for query in queries)
+
+
+@pytest.mark.django_db
+def test_admin_reviewer_filter_falls_back_to_username_lookup(
+    client, admin_user, account, monkeypatch
+):
+    monkeypatch.setattr(ReviewerListFilter, "max_choices", 0)
+    Account.objects.filter(pk=account.pk).bulk_review("approved", admin_user)
+    client.login(username="admin", password="adminpass123")
+
+    response = client.get("/admin/accounts/account/", {"status": "approved"})
+    content = response.content.decode()
+    assert 'name="reviewed_by_username"' in content
+    assert '<input type="hidden" name="status" value="approved">' in content
+
+    response = client.get(
+        "/admin/accounts/account/", {"reviewed_by_username": "nobody"}
+    )
+    assert response.context["cl"].result_count == 0
+    response = client.get("/admin/accounts/account/", {"reviewed_by_username": "admin"})
+    assert response.context["cl"].result_count == 1
+
+
+@pytest.mark.django_db
+def test_admin_search_finds_account_by_phone_prefix(client, admin_user, account):
+    client.login(username="admin", password="adminpass123")
+    response = client.get("/admin/accounts/account/", {"q": "(123) 456"})
+    assert list(response.context["cl"].result_list) == [account]
+
+    response = client.get("/admin/accounts/account/", {"q": "999"})
+    assert list(response.context["cl"].result_list) == []
+
+
+@pytest.mark.django_db
+def test_admin_export_csv_streams_selected_accounts(client, admin_user, account):
+    client.login(username="admin", password="adminpass123")
+    response = client.post(
+        "/admin/accounts/account/",
+        {"action": "export_csv", "_selected_action": [account.id]},
+    )
+
+    assert response.streaming
+    assert response["Content-Type"] == "text/csv"
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    assert lines[0].startswith("id,username,email")
+    assert len(lines) == 2
+    assert lines[1].startswith(f"{account.id},testuser,test@example.com")
+
+
+@pytest.mark.django_db
+def test_admin_bulk_reject_asks_for_reason(client, admin_user, regular_user, account):
+    client.login(username="admin", password="adminpass123")
+    response = client.post(
+        "/admin/accounts/account/",
+        {"action": "reject_accounts", "_selected_action": [account.id]},
+    )
+    assert response.status_code == 200
+    assert 'name="reason"' in response.content.decode()
+
+    account.refresh_from_db()
+    assert account.status == "pending"
+
+
+@pytest.mark.django_db
+def test_admin_bulk_reject_with_reason(client, admin_user, regular_user, account):
+    client.login(username="admin", password="adminpass123")
+    response = client.post(
+        "/admin/accounts/account/",
+        {
+            "action": "reject_accounts",
+            "_selected_action": [account.id],
+            "apply": "yes",
+            "reason": "Incomplete application",
+        },
+    )
+    assert response.status_code == 302
+
+    account.refresh_from_db()
+    assert account.status == "rejected"
+    assert account.rejection_reason == "Incomplete application"
+    assert account.reviewed_by == admin_user
+    assert account.approved_at is None
+
+
+@pytest.mark.django_db
+def test_admin_bulk_request_docs_with_reason(client, admin_user, regular_user, account):
+    client.login(username="admin", password="adminpass123")
+    client.post(
+        "/admin/accounts/account/",
+        {
+            "action": "request_additional_docs",
+            "_selected_action": [account.id],
+            "apply": "yes",
+            "reason": "Proof of address",
+        },
+    )
+
+    account.refresh_from_db()
+    assert account.status == "additional_docs_required"
+    assert account.additional_docs_reason == "Proof of address"
+
+
 @pytest.mark.django_db
 def test_admin_without_account_redirects_to_admin_page(client, admin_user):
     client.login(username="admin", password="adminpass123")
@@ -1,29 +1,40 @@
+from string import Formatter
+from typing import NamedTuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.http import HttpResponse
 from django.shortcuts import redirect, render
+from django.template.loader import render_to_string
+from django.utils import dateformat, timezone
+from django.utils.crypto import constant_time_compare
 
+from accounts.cache import cached_rendering
 from accounts.forms import AccountForm, CombinedRegistrationForm
+from accounts.metrics import render as render_metrics
 from accounts.models import Account
 
 
-def home(request):
-    if request.user.is_authenticated:
+async def home(request):
+    user = await request.auser()
+    if user.is_authenticated:
         return redirect("account_status")
     return redirect("login")
 
 
 def register(request):
     # Check if user is authenticated admin/staff without account
-    if request.user.is_authenticated and (
-        request.user.is_staff or request.user.is_superuser
+    if (
+        request.user.is_authenticated
+        and (request.user.is_staff or request.user.is_superuser)
+        and not request.account
     ):
-        try:
-            Account.objects.get(user=request.user)
-        except Account.DoesNotExist:
-            return redirect("admin_without_account")
+        return redirect("admin_without_account")
 
     if request.method == "POST":
         form = CombinedRegistrationForm(request.POST, request.FILES)
@@ -34,34 +45,36 @@ def register(request):
                     # Create Django User
                     user = form.save()
 
-                    # Create the Securities Account
-                    _ = Account.objects.create(
+                    # Create the Securities Account. The form has checked the
+                    # phone number; a concurrent duplicate fails the insert.
+                    Account(
                         user=user,
                         phone_number=form.cleaned_data["phone_number"],
                         address=form.cleaned_data["address"],
-                    )
+                    ).save(validate_unique=False)
 
                 # Log the user in
-                login(request, user)
+                login(request, user, backend="accounts.backends.HashingModelBackend")
                 messages.success(
                     request,
                     "Registration and account submitted successfully! Please wait for approval.",
                 )
                 return redirect("account_status")
             except ValidationError as e:
-                messages.error(request, str(e))
+                add_save_errors(form, e)
     else:
         form = CombinedRegistrationForm()
     return render(request, "accounts/register.html", {"form": form})
 
 
 @login_required
-def supplement_form(request):
+async def supplement_form(request):
+    user = await request.auser()
     # Check if user already has an account
-    existing_account = Account.objects.filter(user=request.user).first()
+    existing_account = await request.aaccount()
 
     # Check if user is admin/staff without account
-    if not existing_account and (request.user.is_staff or request.user.is_superuser):
+    if not existing_account and (user.is_staff or user.is_superuser):
         return redirect("admin_without_account")
 
     if existing_account and existing_account.status == "approved":
@@ -85,15 +98,16 @@ def supplement_form(request):
 
     if request.method == "POST":
         form = AccountForm(request.POST, request.FILES, instance=existing_account)
-        if form.is_valid():
+        # Checks phone number uniqueness in the database
+        if await sync_to_async(form.is_valid)():
             try:
                 account = form.save(commit=False)
-                account.user = request.user
-                account.save()
+                account.user = user
+                await account.asave(validate_unique=False)
                 messages.success(request, "account submitted successfully!")
                 return redirect("account_status")
             except ValidationError as e:
-                messages.error(request, str(e))
+                add_save_errors(form, e)
     else:
         form = AccountForm(instance=existing_account)
 
@@ -105,12 +119,12 @@ def supplement_form(request):
 
 
 @login_required
-def account_status(request):
-    try:
-        account = Account.objects.get(user=request.user)
-    except Account.DoesNotExist:
+async def account_status(request):
+    user = await request.auser()
+    account = await request.aaccount()
+    if not account:
         # Check if user is admin/staff without account
-        if request.user.is_staff or request.user.is_superuser:
+        if user.is_staff or user.is_superuser:
             return redirect("admin_without_account")
         # Regular user without account should not happen, but redirect to register
         return redirect("register")
@@ -119,73 +133,192 @@ def account_status(request):
     if account.status == "approved":
         return redirect("congratulations")
 
-    context = {"account": account, "status_info": get_status_info(account)}
+    # CSRF token and messages stay in the uncached layout. The cache is on
+    # disk, so it is read off the event loop.
+    context = {
+        "content": await sync_to_async(cached_rendering)(
+            account, "account_status", render_account_status
+        )
+    }
 
     return render(request, "accounts/account_status.html", context)
 
 
 @login_required
-def admin_without_account(request):
+async def admin_without_account(request):
     """View for admin users who don't have an Account instance"""
-    if not (request.user.is_staff or request.user.is_superuser):
+    user = await request.auser()
+    if not (user.is_staff or user.is_superuser):
         return redirect("account_status")
 
     return render(request, "accounts/admin_without_account.html")
 
 
 @login_required
-def congratulations(request):
-    try:
-        account = Account.objects.get(user=request.user)
-    except Account.DoesNotExist:
+async def congratulations(request):
+    user = await request.auser()
+    account = await request.aaccount()
+    if not account:
         # Check if user is admin/staff without account
-        if request.user.is_staff or request.user.is_superuser:
+        if user.is_staff or user.is_superuser:
             return redirect("admin_without_account")
         return redirect("account_status")
 
     if account.status == "approved":
-        return render(request, "accounts/congratulations.html", {"account": account})
+        context = {
+            "content": await sync_to_async(cached_rendering)(
+                account, "congratulations", render_congratulations
+            )
+        }
+        return render(request, "accounts/congratulations.html", context)
     else:
         return redirect("account_status")
 
 
+def metrics(request):
+    """
+    Request metrics of every worker, for Prometheus to scrape. Outside DEBUG
+    they are only served once METRICS_TOKEN is set.
+    """
+    token = settings.METRICS_TOKEN
+    if not token and not settings.DEBUG:
+        return HttpResponse(
+            "Set METRICS_TOKEN to serve /metrics.",
+            status=403,
+            content_type="text/plain",
+        )
+    if token and not constant_time_compare(
+        request.headers.get("Authorization", ""), f"Bearer {token}"
+    ):
+        return HttpResponse(status=401)
+    return HttpResponse(
+        render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+def render_account_status(account):
+    """Renders the account-specific part of the status page"""
+    return render_to_string(
+        "accounts/account_status_content.html",
+        {"account": account, "status_info": get_status_info(account)},
+    )
+
+
+def render_congratulations(account):
+    """Renders the account-specific part of the congratulations page"""
+    return render_to_string(
+        "accounts/congratulations_content.html", {"account": account}
+    )
+
+
+def add_save_errors(form, error):
+    """Shows a ValidationError raised while saving on the form's fields"""
+    for field, errors in error.update_error_dict({}).items():
+        form.add_error(field if field in form.fields else None, errors)
+
+
+class StatusPresentation(NamedTuple):
+    title: str
+    icon: str
+    color: str
+    # str.format() template over STATUS_MESSAGE_FIELDS
+    message: str
+
+
+class StatusInfo(NamedTuple):
+    title: str
+    icon: str
+    color: str
+    message: str
+    submitted_at: str
+    updated_at: str
+
+
+STATUS_PRESENTATION = {
+    "pending": StatusPresentation(
+        title="account Pending",
+        icon="clock",
+        color="warning",
+        message="Your account was submitted on {created_at}. Please wait for review.",
+    ),
+    "approved": StatusPresentation(
+        title="Account Approved",
+        icon="check-circle",
+        color="success",
+        message="Congratulations! Your account was approved on {approved_at}.",
+    ),
+    "rejected": StatusPresentation(
+        title="account Rejected",
+        icon="x-circle",
+        color="danger",
+        message="Your account was rejected. Reason: {rejection_reason}{reviewed_by}",
+    ),
+    "additional_docs_required": StatusPresentation(
+        title="Additional Documents Required",
+        icon="file-text",
+        color="info",
+        message="Please provide additional information: "
+        "{additional_docs_reason}{reviewed_by}",
+    ),
+}
+
+MESSAGE_TIMESTAMP_FORMAT = "%B %d, %Y at %I:%M %p"
+DETAIL_TIMESTAMP_FORMAT = r"F d, Y \a\t g:i A"
+
+
+def _reviewed_by(account):
+    # The account is loaded with its reviewer, so this does not query
+    reviewer = account.reviewed_by if account.reviewed_by_id else None
+    if reviewer is None:
+        return ""
+    return f" (Reviewed by {reviewer.get_full_name() or reviewer.username})"
+
+
+STATUS_MESSAGE_FIELDS = {
+    "created_at": lambda account: account.created_at.strftime(MESSAGE_TIMESTAMP_FORMAT),
+    "approved_at": lambda account: (
+        account.approved_at.strftime(MESSAGE_TIMESTAMP_FORMAT)
+        if account.approved_at
+        else "N/A"
+    ),
+    "rejection_reason": lambda account: (
+        account.rejection_reason or "No specific reason provided"
+    ),
+    "additional_docs_reason": lambda account: (
+        account.additional_docs_reason or "Please contact support for details"
+    ),
+    "reviewed_by": _reviewed_by,
+}
+
+# Fields each status message uses, parsed once
+_MESSAGE_FIELD_NAMES = {
+    status: tuple(name for _, name, _, _ in Formatter().parse(p.message) if name)
+    for status, p in STATUS_PRESENTATION.items()
+}
+
+
 def get_status_info(account):
-    """Returns status-specific information for display"""
-    status_info = {
-        "pending": {
-            "title": "account Pending",
-            "message": f"Your account was submitted on {account.created_at.strftime('%B %d, %Y at %I:%M %p')}. Please wait for review.",
-            "icon": "clock",
-            "color": "warning",
-        },
-        "approved": {
-            "title": "Account Approved",
-            "message": f"Congratulations! Your account was approved on {account.approved_at.strftime('%B %d, %Y at %I:%M %p') if account.approved_at else 'N/A'}.",
-            "icon": "check-circle",
-            "color": "success",
-        },
-        "rejected": {
-            "title": "account Rejected",
-            "message": f"Your account was rejected. Reason: {account.rejection_reason or 'No specific reason provided'}"
-            + (
-                f" (Reviewed by {account.reviewed_by.get_full_name() or account.reviewed_by.username})"
-                if account.reviewed_by
-                else ""
-            ),
-            "icon": "x-circle",
-            "color": "danger",
-        },
-        "additional_docs_required": {
-            "title": "Additional Documents Required",
-            "message": f"Please provide additional information: {account.additional_docs_reason or 'Please contact support for details'}"
-            + (
-                f" (Reviewed by {account.reviewed_by.get_full_name() or account.reviewed_by.username})"
-                if account.reviewed_by
-                else ""
-            ),
-            "icon": "file-text",
-            "color": "info",
-        },
-    }
+    """
+    Returns status-specific information for display. Only the account's own
+    status message is formatted.
+    """
+    status = account.status if account.status in STATUS_PRESENTATION else "pending"
+    presentation = STATUS_PRESENTATION[status]
+    message = presentation.message.format_map(
+        {
+            name: STATUS_MESSAGE_FIELDS[name](account)
+            for name in _MESSAGE_FIELD_NAMES[status]
+        }
+    )
+    return StatusInfo(
+        title=presentation.title,
+        icon=presentation.icon,
+        color=presentation.color,
+        message=message,
+        submitted_at=_format_detail_timestamp(account.created_at),
+        updated_at=_format_detail_timestamp(account.updated_at),
+    )
+
 
-    return status_info.get(account.status, status_info["pending"])
+def _format_detail_timestamp(value):
+    return dateformat.format(timezone.localtime(value), DETAIL_TIMESTAMP_FORMAT)
@@ -12,6 +12,9 @@ python manage.py migrate --no-input
 echo "Collecting static files..."
 python manage.py collectstatic --no-input || echo "Static files collection failed, continuing..."
 
+# Request metrics start from zero; the previous run's workers are gone
+rm -rf "${METRICS_DIR:-/tmp/metrics/securities_firm}"
+
 # Start uvicorn directly (no exec "$@")
 WORKER_COUNT=${UVICORN_WORKER_NUMS:-1}
 if [ "$UVICORN_DEBUG_RELOAD" = "true" ]; then
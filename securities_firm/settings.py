@@ -14,6 +14,9 @@ import os
 from pathlib import Path
 
 import structlog
+from django.core.exceptions import ImproperlyConfigured
+
+from accounts import audit_log
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -48,12 +51,17 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so the latency it records includes the other middleware
+    "accounts.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    # AuthenticationMiddleware that also loads request.account in the same query
+    "accounts.middleware.AccountMiddleware",
+    # After AccountMiddleware, which it needs to tell staff users apart
+    "accounts.middleware.RequestProfilerMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "django_structlog.middlewares.RequestMiddleware",
@@ -92,8 +100,34 @@ if IS_DEPLOYED:
             "HOST": os.environ.get("POSTGRES_HOST"),
             "PORT": os.environ.get("POSTGRES_PORT"),
             "OPTIONS": {"application_name": os.environ.get("APP_NAME")},
+            # Persistent connections, used when the pool is off
+            "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", "60")),
+            "CONN_HEALTH_CHECKS": True,
         }
     }
+
+    # Each uvicorn worker process keeps its own psycopg pool, so Postgres sees
+    # up to UVICORN_WORKER_NUMS * DB_POOL_MAX_SIZE connections. With
+    # DB_POOL=false the persistent connections above are used instead.
+    if os.environ.get("DB_POOL", "true").lower() == "true":
+        try:
+            from psycopg_pool import ConnectionPool
+        except ImportError as e:
+            raise ImproperlyConfigured(
+                "DB_POOL requires the psycopg[pool] extra; install it or set "
+                "DB_POOL=false."
+            ) from e
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", "10")),
+            # Seconds a request waits for a free connection before failing
+            "timeout": float(os.environ.get("DB_POOL_TIMEOUT", "10")),
+            "max_idle": float(os.environ.get("DB_POOL_MAX_IDLE", "300")),
+            "max_lifetime": float(os.environ.get("DB_POOL_MAX_LIFETIME", "3600")),
+            # Checks each connection as it is handed out, like CONN_HEALTH_CHECKS
+            "check": ConnectionPool.check_connection,
+        }
 else:
     DATABASES = {
         "default": {
@@ -102,6 +136,79 @@ else:
         }
     }
 
+# Cache
+# The file-based cache is shared by every uvicorn worker on the host, so a
+# change made through one worker is visible to the others. Culling lists the
+# whole directory, so it runs at most every CACHE_CULL_INTERVAL seconds.
+CACHES = {
+    "default": {
+        "BACKEND": "accounts.cache_backends.FileBasedCache",
+        "LOCATION": os.environ.get("CACHE_LOCATION", "/tmp/cache/securities_firm"),
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.environ.get("CACHE_MAX_ENTRIES", "20000")),
+            "CULL_INTERVAL": float(os.environ.get("CACHE_CULL_INTERVAL", "60")),
+        },
+    },
+    # Kept apart so culling account snapshots never evicts sessions
+    "sessions": {
+        "BACKEND": "accounts.cache_backends.FileBasedCache",
+        "LOCATION": os.environ.get(
+            "SESSION_CACHE_LOCATION", "/tmp/cache/securities_firm_sessions"
+        ),
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.environ.get("SESSION_CACHE_MAX_ENTRIES", "20000")),
+            "CULL_INTERVAL": float(os.environ.get("CACHE_CULL_INTERVAL", "60")),
+        },
+    },
+}
+ACCOUNT_CACHE_ALIAS = "default"
+ACCOUNT_CACHE_TIMEOUT = int(os.environ.get("ACCOUNT_CACHE_TIMEOUT", "86400"))
+
+# Request metrics, served at /metrics. Each worker writes its totals to
+# METRICS_DIR at most every METRICS_FLUSH_INTERVAL seconds and /metrics adds
+# up the files, so every worker of the host must share the directory.
+# /metrics requires "Authorization: Bearer <METRICS_TOKEN>", and is refused
+# outside DEBUG while METRICS_TOKEN is empty.
+METRICS_DIR = os.environ.get("METRICS_DIR", "/tmp/metrics/securities_firm")
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", "5"))
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+# Slow query capture (accounts/slow_queries.py), off while SLOW_QUERY_MS is 0.
+# Queries at least SLOW_QUERY_MS long are logged with their view, SQL
+# fingerprint and call site, and the first of each fingerprint is EXPLAINed
+# on PostgreSQL. SLOW_QUERY_SAMPLE_RATE of all queries is also kept, with the
+# slow ones, in a ring buffer of SLOW_QUERY_BUFFER_SIZE entries per worker.
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "0"))
+SLOW_QUERY_SAMPLE_RATE = float(os.environ.get("SLOW_QUERY_SAMPLE_RATE", "0.01"))
+SLOW_QUERY_BUFFER_SIZE = int(os.environ.get("SLOW_QUERY_BUFFER_SIZE", "1000"))
+SLOW_QUERY_EXPLAIN = os.environ.get("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+
+# On-demand request profiling (accounts/profiling.py). Staff requests with an
+# "X-Profile: 1" header or a "_profile=1" query parameter are profiled into
+# PROFILER_DIR, keeping the top PROFILER_TOP_N functions in the text report.
+PROFILER_DIR = os.environ.get("PROFILER_DIR", "/tmp/profiles/securities_firm")
+PROFILER_TOP_N = int(os.environ.get("PROFILER_TOP_N", "40"))
+
+# Sessions
+# SESSION_PROFILE picks where sessions are stored:
+#   db: the database, read on every authenticated request
+#   cached_db: the database behind the shared "sessions" cache, so reads only
+#     reach the database after a cache miss
+#   signed_cookies: the signed session cookie itself, with no server-side
+#     storage. A session cannot be revoked before it expires, except by a
+#     password change (the session auth hash) or a SECRET_KEY rotation.
+SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+SESSION_ENGINE = SESSION_ENGINES[os.environ.get("SESSION_PROFILE", "db")]
+SESSION_CACHE_ALIAS = "sessions"
+
+# Covering indexes only exist on PostgreSQL, SQLite builds them without the
+# included columns
+SILENCED_SYSTEM_CHECKS = ["models.W040"]
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -121,6 +228,49 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+AUTHENTICATION_BACKENDS = [
+    "accounts.backends.HashingModelBackend",
+    # Sessions record the backend that logged them in, so ModelBackend stays
+    # listed for sessions started before HashingModelBackend. It never checks
+    # a password: HashingModelBackend settles every password login.
+    "django.contrib.auth.backends.ModelBackend",
+]
+
+# PASSWORD_HASHER picks the hasher for new passwords; the others still verify
+# existing hashes. "argon2" requires the django[argon2] extra.
+PREFERRED_PASSWORD_HASHERS = {
+    "pbkdf2": "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "argon2": "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "scrypt": "django.contrib.auth.hashers.ScryptPasswordHasher",
+}
+if os.environ.get("PASSWORD_HASHER") == "argon2":
+    try:
+        import argon2  # noqa: F401
+    except ImportError as e:
+        raise ImproperlyConfigured(
+            "PASSWORD_HASHER=argon2 requires the django[argon2] extra; install "
+            "it or pick another hasher."
+        ) from e
+PASSWORD_HASHERS = list(
+    dict.fromkeys(
+        [
+            PREFERRED_PASSWORD_HASHERS[os.environ.get("PASSWORD_HASHER", "pbkdf2")],
+            "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+            "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+            "django.contrib.auth.hashers.Argon2PasswordHasher",
+            "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+            "django.contrib.auth.hashers.ScryptPasswordHasher",
+        ]
+    )
+)
+
+# Processes that compute password hashes for registration and login (see
+# accounts/hashing.py). 0 hashes inline in the request thread.
+PASSWORD_HASHING_WORKERS = int(os.environ.get("PASSWORD_HASHING_WORKERS", "0"))
+# Hashes that may be queued or running at once; 0 means four per worker
+PASSWORD_HASHING_MAX_PENDING = int(os.environ.get("PASSWORD_HASHING_MAX_PENDING", "0"))
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -132,6 +282,10 @@ USE_I18N = True
 
 USE_TZ = True
 
+# Country calling code assumed for phone numbers entered without one (see
+# accounts/phone.py)
+PHONE_DEFAULT_COUNTRY_CODE = os.environ.get("PHONE_DEFAULT_COUNTRY_CODE", "886")
+
 
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
@@ -149,52 +303,37 @@ logs_dir = Path("/tmp/logs")
 logs_dir.mkdir(exist_ok=True)
 
 # Logging configuration
+# Every event is rendered once to JSON and written to json.log by a background
+# thread, so requests never wait on the disk or the console.
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
     "formatters": {
         "json_formatter": {
             "()": structlog.stdlib.ProcessorFormatter,
-            "processor": structlog.processors.JSONRenderer(),
-        },
-        "plain_console": {
-            "()": structlog.stdlib.ProcessorFormatter,
-            "processor": structlog.dev.ConsoleRenderer(),
-        },
-        "key_value": {
-            "()": structlog.stdlib.ProcessorFormatter,
-            "processor": structlog.processors.KeyValueRenderer(
-                key_order=["timestamp", "level", "event", "logger"]
-            ),
+            "processor": structlog.processors.JSONRenderer(serializer=audit_log.dumps),
         },
     },
     "handlers": {
-        "console": {
-            "class": "logging.StreamHandler",
-            "formatter": "plain_console",
-        },
-        "json_file": {
-            "class": "logging.handlers.WatchedFileHandler",
+        "audit_sink": {
+            "()": audit_log.QueuedAuditHandler,
             "filename": str(logs_dir / "json.log"),
+            "console": os.environ.get("AUDIT_LOG_CONSOLE", "true").lower() == "true",
+            "queue_size": int(os.environ.get("AUDIT_LOG_QUEUE_SIZE", "10000")),
             "formatter": "json_formatter",
         },
-        "flat_line_file": {
-            "class": "logging.handlers.WatchedFileHandler",
-            "filename": str(logs_dir / "flat_line.log"),
-            "formatter": "key_value",
-        },
     },
     "loggers": {
         "django_structlog": {
-            "handlers": ["console", "flat_line_file", "json_file"],
+            "handlers": ["audit_sink"],
             "level": "INFO",
         },
         "securities_firm": {
-            "handlers": ["console", "flat_line_file", "json_file"],
+            "handlers": ["audit_sink"],
             "level": "INFO",
         },
         "accounts": {
-            "handlers": ["console", "flat_line_file", "json_file"],
+            "handlers": ["audit_sink"],
             "level": "INFO",
         },
     },
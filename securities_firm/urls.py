@@ -19,8 +19,11 @@ from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import RedirectView
 
+from accounts.views import metrics
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("accounts/", include("accounts.urls")),
+    path("metrics", metrics, name="metrics"),
     path("", RedirectView.as_view(url="/accounts/", permanent=False)),
 ]